@@ -0,0 +1,57 @@
+"""
+How `validate_long.validate_all_long` scales with its thread pool, on fuzzed G217 data.
+
+    python benchmarks/validate_all_long.py [rows] [max workers]
+
+Times the validators with 1 to `max workers` threads (defaults to the number of CPUs), then profiles one serial run
+for the share of time spent in Polars' `collect`, the only part of an interrogation which releases the GIL
+(pointblank builds each step in Python). That share bounds the speedup on any number of cores (Amdahl's law).
+"""
+import cProfile
+import os
+import pstats
+import sys
+import time
+from pathlib import Path
+
+sys.path[:0] = [str(Path(__file__).parents[1] / "src"), str(Path(__file__).parents[1] / "tests")]
+
+from fuzz import fuzz_long_form
+from harmonise_long import harmonise_ipaq_long
+from validate_long import long_validators, validate_all_long, with_derived_columns
+
+def best_time(run, repeat: int = 3) -> float:
+    "The fastest of `repeat` runs, in seconds."
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def collect_share(df) -> float:
+    "The share of a serial run of the validators spent in Polars' `collect`."
+    profile = cProfile.Profile()
+    profile.runcall(lambda: {name: validator(df) for name, validator in long_validators.items()})
+    stats = pstats.Stats(profile)
+    collect = sum(tottime for (_, _, function), (_, _, tottime, *_) in stats.stats.items() if "PyLazyFrame" in function and "collect" in function)
+    return collect / stats.total_tt
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    df = harmonise_ipaq_long("G217", fuzz_long_form(n_rows))
+    with_derived_columns(df) # built once, as `validate_all_long` does, and shared by every run
+    validate_all_long(df, workers=1) # warm up
+
+    print(f"{n_rows} rows, {os.cpu_count()} CPUs")
+    print("workers  time     speedup")
+    serial = best_time(lambda: validate_all_long(df, workers=1))
+    print(f"{1:>7}  {serial:6.2f}s  {1:6.2f}x")
+    for workers in range(2, max_workers + 1):
+        elapsed = best_time(lambda: validate_all_long(df, workers=workers))
+        print(f"{workers:>7}  {elapsed:6.2f}s  {serial / elapsed:6.2f}x")
+
+    share = collect_share(df)
+    print(f"collect is {share:.0%} of a serial run, so the speedup is at most {1 / (1 - share):.2f}x")
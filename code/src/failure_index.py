@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import polars as pl
+
+from validate_lazy import Rules
+
+ROW = "row"
+
+def _expand_runs(runs: pl.DataFrame) -> pl.Series:
+    "Expand runs back into the sorted row positions they cover."
+    return (
+        runs.select(pl.int_ranges("start", pl.col("start") + pl.col("length"), dtype=pl.UInt32).alias(ROW))
+        .explode(ROW)
+        .drop_nulls()
+        .get_column(ROW)
+    )
+
+class FailureIndex:
+    """
+    The failing rows of each validation rule, stored as runs of consecutive row positions.
+
+    Failures tend to cluster (a whole wave with a missing variable, a block of IDs entered the same way),
+    so the runs are far smaller than a list of rows, and can be queried without re-validating the data.
+    """
+    def __init__(
+        self,
+        runs: pl.DataFrame, # columns `rule`, `start` and `length`, sorted by rule then start
+        ids: pl.Series, # the ID of each row position
+    ):
+        self.runs = runs
+        self.ids = ids
+        self._by_rule = runs.partition_by("rule", as_dict=True, include_key=False)
+
+    @property
+    def rules(self) -> list[str]:
+        "The rules with at least one failing row."
+        return [rule for (rule,) in self._by_rule]
+
+    def rows(self, rule: str) -> pl.Series:
+        "The positions of the rows which failed `rule`."
+        runs = self._by_rule.get((rule,))
+        if runs is None:
+            return pl.Series(ROW, [], dtype=pl.UInt32)
+        return _expand_runs(runs)
+
+    def union(self, *rules: str) -> pl.Series:
+        "The positions of the rows which failed any of `rules` (none, for no rules)."
+        if not rules:
+            return pl.Series(ROW, [], dtype=pl.UInt32)
+        return pl.concat([self.rows(rule) for rule in rules]).unique().sort()
+
+    def intersect(self, *rules: str) -> pl.Series:
+        "The positions of the rows which failed all of `rules` (none, for no rules)."
+        if not rules:
+            return pl.Series(ROW, [], dtype=pl.UInt32)
+        rows = self.rows(rules[0])
+        for rule in rules[1:]:
+            rows = rows.filter(rows.is_in(self.rows(rule)))
+        return rows
+
+    def failing_ids(self, rows: str | pl.Series) -> pl.Series:
+        "The IDs of the failing rows, given a rule or positions from `union` or `intersect`."
+        if isinstance(rows, str):
+            rows = self.rows(rows)
+        return self.ids.gather(rows)
+
+    def fetch(self, rows: str | pl.Series, data: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+        "The failing rows of `data`, which must be the frame the index was built from."
+        if isinstance(rows, str):
+            rows = self.rows(rows)
+        if isinstance(data, pl.DataFrame):
+            return data[rows]
+        return data.with_row_index(ROW).filter(pl.col(ROW).is_in(rows)).drop(ROW).collect()
+
+    def save(self, path: Path) -> None:
+        "Save the runs and IDs to the directory `path`."
+        path.mkdir(parents=True, exist_ok=True)
+        self.runs.write_parquet(path / "runs.parquet")
+        self.ids.to_frame().write_parquet(path / "ids.parquet")
+
+    @classmethod
+    def load(cls, path: Path) -> "FailureIndex":
+        "Load an index saved with `save`."
+        return cls(pl.read_parquet(path / "runs.parquet"), pl.read_parquet(path / "ids.parquet").to_series())
+
+def failing_rows(
+    checked: pl.LazyFrame, # one boolean column per rule, ie. `lf.select(rule.alias(name) for name, rule in rules.items())`
+) -> pl.LazyFrame:
+    "The `rule` and row position of every failed row of `checked`, found with one pass over all of the rules."
+    return (
+        checked.with_row_index(ROW)
+        .unpivot(index=ROW, variable_name="rule", value_name="passed")
+        .filter(pl.col("passed").not_())
+        .select("rule", ROW)
+    )
+
+def row_runs(failing: pl.DataFrame) -> pl.DataFrame:
+    "Collapse the failing rows from `failing_rows` into runs, sorted by rule then start, as `FailureIndex` takes them."
+    return (
+        failing.sort("rule", ROW)
+        .group_by("rule", pl.col(ROW).diff().ne(1).fill_null(True).cum_sum().over("rule").alias("run"))
+        .agg(pl.col(ROW).min().alias("start"), pl.len().cast(pl.UInt32).alias("length"))
+        .sort("rule", "start")
+        .drop("run")
+    )
+
+def build_failure_index(
+    lf: pl.LazyFrame | pl.DataFrame,
+    rules: Rules, # ie. from `validate_lazy.long_form_rules`
+    id_column: str = "ID",
+) -> FailureIndex:
+    """
+    Evaluate `rules` with the streaming engine and index the failing rows of each.
+
+    Only the failing rows are kept in memory, so this scales like `validate_lazy.validate_lazy`.
+    """
+    lf = lf.lazy()
+    checked = lf.select(*[rule.alias(name) for name, rule in rules.items()])
+
+    failing, ids = pl.collect_all([failing_rows(checked), lf.select(id_column)], streaming=True, comm_subplan_elim=False)
+    return FailureIndex(row_runs(failing), ids.to_series())
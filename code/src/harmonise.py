@@ -1,5 +1,11 @@
+from typing import Callable
+
 import polars as pl
 
+from rule_tree import input_columns
+from sparse import SparseBlock
+from streaming import check_streaming
+
 # Config
 categories = ["VIG", "MOD", "WALK"]
 categories_with_factors = {"VIG": 8, "MOD": 4, "WALK": 3.3}
@@ -361,27 +367,85 @@ def recalculate_sit_trunc(prefix: str) -> list[pl.expr]:
 
     return expressions
 
-def harmonise_ipaq(
+def harmonise_stages(prefix: str) -> list[list[pl.Expr]]:
+    """
+    The harmonisation rules in the order they're applied, each stage being one `with_columns`.
+
+    Shared by `harmonise_ipaq` and the other backends (ie. `harmonise_sql`), so they can't drift apart.
+    """
+    return [
+        clean_weekly_activity(prefix),
+        [create_ipaq_activity_dummy_variable(prefix)],
+        clean_when_no_activity(prefix),
+        clean_days(prefix),
+        clean_hpd(prefix),
+        clean_mpd(prefix),
+        recalculate_mins(prefix),
+        recalculate_met(prefix),
+        [recalculate_tot_met(prefix)],
+        clean_when_weekly_activity_is_0(prefix),
+        [recalculate_ipaq_cat(prefix)],
+    ]
+
+# Helper columns created by the stages, which are dropped from the output
+dropped_columns = ["IPAQ_ACTIVITY"]
+
+# The share of rows with no activity above which `harmonise_active_rows` only harmonises the active rows;
+# gathering their results back costs about as much as the stages it saves at ~70%, so this leaves a margin
+min_inactive_share = 0.8
+
+def no_activity(prefix: str) -> pl.Expr:
+    """
+    Whether a row has no valid W for any category, ie. `IPAQ_ACTIVITY == 0`.
+    Every stage then leaves its columns null, so these rows needn't be harmonised (see `harmonise_active_rows`).
+    """
+    return pl.all_horizontal(exp.is_null() for exp in clean_weekly_activity(prefix))
+
+def harmonise_active_rows(
     prefix: str,
     df: pl.DataFrame,
+    harmonise_rows: Callable[[pl.DataFrame], pl.DataFrame], # ie. `harmonise_ipaq` with the fast path off
 ) -> pl.DataFrame:
+    """
+    Harmonise only the rows with any activity, and leave the columns the stages write null in the rest,
+    so the cost of the rules scales with the active respondents rather than the whole cohort.
+
+    Only the columns the stages use are filtered, and the ones they write are gathered back into the rows' order
+    (so by `ID`, as the interim data is sorted by it), so the other columns are never copied.
+    Unless more than `min_inactive_share` of the rows are inactive, every row is harmonised, as that's faster.
+    """
+    inactive = df.select(no_activity(prefix)).to_series()
+    if inactive.sum() <= min_inactive_share * df.height:
+        return harmonise_rows(df)
+
+    expressions = [exp for stage in harmonise_stages(prefix) for exp in stage]
+    written = {exp.meta.output_name() for exp in expressions}
+    used = written | {column for exp in expressions for column in input_columns(exp)}
+    active = harmonise_rows(df.select(column for column in df.columns if column in used).filter(~inactive))
+
+    block = SparseBlock(~inactive, active, dict.fromkeys(active.columns))
+    return df.with_columns(block.densify([column for column in active.columns if column in written]))
+
+def harmonise_ipaq(
+    prefix: str,
+    df: pl.DataFrame | pl.LazyFrame,
+    streaming: bool = False,
+    skip_inactive: bool = True, # see `harmonise_active_rows`
+) -> pl.DataFrame | pl.LazyFrame:
     """
     Apply harmonisation functions to the given dataset.
+
+    With `streaming`, returns the lazy plan to run with the streaming engine (ie. with `sink_parquet`),
+    warning about any operations in it which can't stream.
+
+    With `skip_inactive`, the rules only run on the rows of a DataFrame with any activity, if most have none.
     """
-    harmonised_df = (
-        df
-        .with_columns(clean_weekly_activity(prefix))
-        .with_columns(create_ipaq_activity_dummy_variable(prefix))
-        .with_columns(clean_when_no_activity(prefix))
-        .with_columns(clean_days(prefix))
-        .with_columns(clean_hpd(prefix))
-        .with_columns(clean_mpd(prefix))
-        .with_columns(recalculate_mins(prefix))
-        .with_columns(recalculate_met(prefix))
-        .with_columns(recalculate_tot_met(prefix))
-        .with_columns(clean_when_weekly_activity_is_0(prefix))
-        .with_columns(recalculate_ipaq_cat(prefix))
-        .drop("IPAQ_ACTIVITY")
-    )
+    if skip_inactive and isinstance(df, pl.DataFrame) and not streaming:
+        return harmonise_active_rows(prefix, df, lambda rows: harmonise_ipaq(prefix, rows, skip_inactive=False))
+
+    harmonised_df = df.lazy() if streaming else df
+    for stage in harmonise_stages(prefix):
+        harmonised_df = harmonised_df.with_columns(stage)
+    harmonised_df = harmonised_df.drop(dropped_columns)
 
-    return harmonised_df
\ No newline at end of file
+    return check_streaming(harmonised_df) if streaming else harmonised_df
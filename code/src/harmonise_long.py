@@ -1,5 +1,8 @@
 import polars as pl
 
+from sparse import with_columns_sparse
+from streaming import check_streaming
+
 # Config
 categories = [
     "JOB_VIG", 
@@ -48,6 +51,16 @@ met_categories = {
 
 total_met = {"TOT_MET": ["VIG", "MOD", "WALK"]}
 
+# Domains whose columns are null for most participants (ie. those without a job), which are harmonised sparsely
+sparse_domains = ["JOB", "TRANS", "HOME"]
+# The share of rows with any value in a domain below which it's harmonised sparsely; above ~40%,
+# gathering the results back into the frame costs more than the stages it saves
+max_sparse_density = 0.3
+
+def domain_columns(prefix: str, columns: list[str]) -> list[list[str]]:
+    "The columns of each of `sparse_domains` in `columns`, ie. `G217_IPAQ_JOB_VIG_D`."
+    return [[column for column in columns if column.startswith(f"{prefix}_IPAQ_{domain}_")] for domain in sparse_domains]
+
 def clean_days(prefix: str) -> list[pl.expr]:
     """
     Clean the number of days of exercise per week.
@@ -313,27 +326,51 @@ def recalculate_ipaq_cat(prefix: str) -> pl.expr:
         .alias(f"{prefix}_IPAQ_CAT")
     )
 
+def harmonise_stages(prefix: str) -> list[list[pl.Expr]]:
+    """
+    The harmonisation rules in the order they're applied, each stage being one `with_columns`.
+
+    Shared by `harmonise_ipaq_long` and the other backends (ie. `harmonise_sql`), so they can't drift apart.
+    """
+    return [
+        clean_days(prefix),
+        clean_hpd(prefix),
+        clean_mpd(prefix),
+        recalculate_sit_trunc(prefix),
+        create_dummy_met_variables(prefix),
+        recalculate_met(prefix, met_categories),
+        recalculate_met(prefix, total_met),
+        [recalculate_ipaq_cat(prefix)],
+    ]
+
 def harmonise_ipaq_long(
     prefix: str,
-    df: pl.DataFrame,
-) -> pl.DataFrame:
+    df: pl.DataFrame | pl.LazyFrame,
+    streaming: bool = False,
+    sparse: bool = False, # see `sparse_domains`
+) -> pl.DataFrame | pl.LazyFrame:
     """
     Apply harmonisation functions to the given dataset.
+
+    With `streaming`, returns the lazy plan to run with the streaming engine (ie. with `sink_parquet`),
+    warning about any operations in it which can't stream.
+
+    With `sparse`, the stages of each mostly empty domain of a DataFrame (see `sparse_domains`) only run on the rows
+    with any of its values, until the totals across domains (see `sparse.with_columns_sparse`).
+    This saves memory, but not time: it's no faster than harmonising every row.
     """
-    harmonised_df = (
-        df
-        .with_columns(clean_days(prefix))
-        .with_columns(clean_hpd(prefix))
-        .with_columns(clean_mpd(prefix))
-        .with_columns(recalculate_sit_trunc(prefix))
-        .with_columns(create_dummy_met_variables(prefix))
-        .with_columns(recalculate_met(prefix, met_categories))
-        .with_columns(recalculate_met(prefix, total_met))
-        .with_columns(recalculate_ipaq_cat(prefix))
-        .select(pl.col(sorted_columns))
-    )
+    if sparse and isinstance(df, pl.DataFrame) and not streaming:
+        harmonised_df = with_columns_sparse(
+            df, harmonise_stages(prefix), domain_columns(prefix, df.columns), max_sparse_density,
+        )
+        return harmonised_df.select(pl.col(sorted_columns))
+
+    harmonised_df = df.lazy() if streaming else df
+    for stage in harmonise_stages(prefix):
+        harmonised_df = harmonised_df.with_columns(stage)
+    harmonised_df = harmonised_df.select(pl.col(sorted_columns))
 
-    return harmonised_df
+    return check_streaming(harmonised_df) if streaming else harmonised_df
 
 sorted_columns = [
     'ID',
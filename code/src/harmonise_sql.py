@@ -0,0 +1,135 @@
+from typing import Any
+
+import duckdb
+
+from rule_tree import expression_tree, function_inputs, function_name, literal_value
+from schedule import dataset_stages
+
+# Polars binary operators which have the same semantics in SQL, including for nulls
+_OPERATORS = {
+    "Eq": "=", "NotEq": "<>", "Lt": "<", "LtEq": "<=", "Gt": ">", "GtEq": ">=",
+    "And": "AND", "Or": "OR", "Plus": "+", "Minus": "-", "Multiply": "*", "TrueDivide": "/",
+}
+
+_TYPES = {
+    "Boolean": "BOOLEAN", "Int8": "TINYINT", "Int16": "SMALLINT", "Int32": "INTEGER", "Int64": "BIGINT",
+    "UInt8": "UTINYINT", "UInt16": "USMALLINT", "UInt32": "UINTEGER", "UInt64": "UBIGINT",
+    "Float32": "FLOAT", "Float64": "DOUBLE", "String": "VARCHAR",
+}
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _sql_value(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+def _function_sql(function: Any, inputs: list[str]) -> str:
+    name, options = function_name(function)
+    match name:
+        case "FillNull":
+            return f"COALESCE({inputs[0]}, {inputs[1]})"
+        case "IsNull":
+            return f"({inputs[0]} IS NULL)"
+        case "IsNotNull":
+            return f"({inputs[0]} IS NOT NULL)"
+        case "Not":
+            return f"(NOT {inputs[0]})"
+        case "IsBetween":
+            lower = ">=" if options["closed"] in ("Both", "Left") else ">"
+            upper = "<=" if options["closed"] in ("Both", "Right") else "<"
+            return f"({inputs[0]} {lower} {inputs[1]} AND {inputs[0]} {upper} {inputs[2]})"
+        case "IsIn":
+            return f"({inputs[0]} IN {inputs[1]})"
+        case "Round":
+            # Both round half away from zero
+            return f"ROUND({inputs[0]}, {options['decimals']})"
+        case "SumHorizontal":
+            # Polars skips nulls, so a row of nulls sums to 0
+            return "(" + " + ".join(f"COALESCE({i}, 0)" for i in inputs) + ")"
+        case "MinHorizontal":
+            # DuckDB's LEAST skips nulls, like Polars
+            return f"LEAST({', '.join(inputs)})"
+        case "MaxHorizontal":
+            return f"GREATEST({', '.join(inputs)})"
+        case "AnyHorizontal":
+            return "(" + " OR ".join(inputs) + ")"
+        case "AllHorizontal":
+            return "(" + " AND ".join(inputs) + ")"
+    raise NotImplementedError(f"No SQL translation for the Polars function {function}")
+
+def to_sql(node: dict) -> str:
+    "Compile a serialised Polars expression (see `expression_tree`) to SQL."
+    kind, value = next(iter(node.items()))
+    match kind:
+        case "Alias":
+            return to_sql(value[0])
+        case "Column":
+            return quote(value)
+        case "Literal":
+            literal = literal_value(node)
+            if isinstance(literal, list):
+                return "(" + ", ".join(_sql_value(v) for v in literal) + ")"
+            return _sql_value(literal)
+        case "BinaryExpr":
+            left, op, right = to_sql(value["left"]), value["op"], to_sql(value["right"])
+            if op in _OPERATORS:
+                return f"({left} {_OPERATORS[op]} {right})"
+            if op == "FloorDivide":
+                return f"FLOOR({left} / {right})"
+            if op == "Modulus":
+                # Polars' modulus takes the sign of the divisor, SQL's the sign of the dividend
+                return f"((({left} % {right}) + {right}) % {right})"
+            raise NotImplementedError(f"No SQL translation for the Polars operator {op}")
+        case "Ternary":
+            return f"CASE WHEN {to_sql(value['predicate'])} THEN {to_sql(value['truthy'])} ELSE {to_sql(value['falsy'])} END"
+        case "Function":
+            return _function_sql(value["function"], [to_sql(i) for i in function_inputs(value["input"])])
+        case "Cast":
+            dtype = value["dtype"] if isinstance(value["dtype"], str) else None
+            sql = to_sql(value["expr"])
+            return f"CAST({sql} AS {_TYPES[dtype]})" if dtype in _TYPES else sql
+    raise NotImplementedError(f"No SQL translation for the Polars expression {kind}")
+
+def harmonise_sql(
+    dset: str,
+    table: str, # the table or view of the interim data
+    columns: list[str], # the columns of `table`
+) -> str:
+    """
+    Compile the harmonisation of `dset` (see `schedule.harmonise_dataset`) to a DuckDB SQL query over `table`.
+
+    Each `with_columns` stage becomes a CTE selecting every column, with the rules as `CASE` expressions.
+    """
+    stages, output = dataset_stages(dset, columns)
+
+    ctes = []
+    source = quote(table)
+    for i, stage in enumerate(stages):
+        compiled = {expr.meta.output_name(): to_sql(expression_tree(expr)) for expr in stage}
+        select = [f"{compiled[c]} AS {quote(c)}" if c in compiled else quote(c) for c in columns]
+        select += [f"{sql} AS {quote(c)}" for c, sql in compiled.items() if c not in columns]
+        ctes.append(f"stage_{i} AS (SELECT {', '.join(select)} FROM {source})")
+        columns = columns + [c for c in compiled if c not in columns]
+        source = f"stage_{i}"
+
+    return f"WITH {', '.join(ctes)} SELECT {', '.join(quote(c) for c in output)} FROM {source}"
+
+def harmonise_duckdb(
+    con: duckdb.DuckDBPyConnection,
+    dset: str,
+    table: str,
+    output: str | None = None, # a table to create with the harmonised data
+) -> duckdb.DuckDBPyRelation:
+    """
+    Harmonise `table` in DuckDB, without exporting it, returning the result as a relation
+    (ie. `.pl()` for a Polars frame) or creating the table `output`.
+    """
+    query = harmonise_sql(dset, table, con.table(table).columns)
+    if output is not None:
+        con.execute(f"CREATE OR REPLACE TABLE {quote(output)} AS {query}")
+        return con.table(output)
+    return con.sql(query)
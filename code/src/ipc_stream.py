@@ -0,0 +1,35 @@
+import sys
+from typing import BinaryIO
+
+import polars as pl
+import pyarrow as pa
+
+from schedule import harmonise_dataset
+
+def harmonise_ipc_stream(
+    dset: str,
+    source: BinaryIO, # an Arrow IPC stream of the dataset's interim columns
+    sink: BinaryIO,
+) -> int:
+    """
+    Harmonise an Arrow IPC stream record batch by record batch, writing the harmonised batches as an IPC stream,
+    so memory stays at about one batch whatever the length of the stream. Returns the number of rows.
+
+    The output schema is that of harmonising an empty frame, so it is written (and downstream readers start)
+    before the first batch arrives, and an empty stream gives an empty, but valid, output stream.
+    """
+    reader = pa.ipc.open_stream(source)
+    schema = harmonise_dataset(dset, pl.from_arrow(reader.schema.empty_table())).to_arrow().schema
+
+    n_rows = 0
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in reader:
+            harmonised = harmonise_dataset(dset, pl.from_arrow(batch)).to_arrow()
+            writer.write_table(harmonised.cast(schema))
+            sink.flush()
+            n_rows += batch.num_rows
+    return n_rows
+
+if __name__ == "__main__":
+    # Harmonise a dataset in a shell pipeline, ie. `... | python ipc_stream.py G220 | ...`
+    harmonise_ipc_stream(sys.argv[1], sys.stdin.buffer, sys.stdout.buffer)
@@ -1,33 +1,83 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
 from odyssey.core import write_sav
 
 from utils import read_data, update_metadata
-from harmonise_long import harmonise_ipaq_long
-from harmonise import harmonise_ipaq, clean_sit_variables, recalculate_sit_trunc
+from row_hash import row_hashes, hashes_path, content_fingerprint
+from schedule import harmonise_all, harmonise_dataset, worker_pool
+from sav import scan_sav
+from pipeline import run_pipeline
+from plan import plan
 from config import DATASETS, INTERIM_DATA, PROCESSED_DATA, METADATA, LONG_METADATA
 
-def main():
+MANIFEST = PROCESSED_DATA / "manifest.json"
+
+def main_streaming(sink_format: str = "parquet"):
+    """
+    Harmonise every dataset out of core with the Polars streaming engine, sinking to Parquet or IPC (`sink_format`)
+    chunk by chunk, ie. `G217_TeenQ.parquet`.
+
+    SAV files can only be written from memory, so no SAV files or metadata are written.
+    """
+    plan(DATASETS, INTERIM_DATA, "harmonise")
+
     for dset in DATASETS:
         file = DATASETS[dset]["file"]
-        df, meta = read_data(file, INTERIM_DATA)
-        if dset == "G217":
-            harmonised_df = harmonise_ipaq_long(dset, df)
-            new_meta = LONG_METADATA
-        else:
-            harmonised_df = harmonise_ipaq(dset, df)
-            new_meta = METADATA
-
-        # Additional cleaning required for G222 and G126 for SIT variables
-        if dset in ["G222", "G126"]:
-            harmonised_df = (
-                harmonised_df
-                .with_columns(clean_sit_variables(dset))
-                .with_columns(recalculate_sit_trunc(dset))
-            )
+        with tempfile.TemporaryDirectory() as staging:
+            lf = harmonise_dataset(dset, scan_sav(INTERIM_DATA/file, Path(staging)), streaming=True)
+            if sink_format == "ipc":
+                lf.sink_ipc((PROCESSED_DATA/file).with_suffix(".arrow"))
+            else:
+                lf.sink_parquet((PROCESSED_DATA/file).with_suffix(".parquet"))
+
+def main(n_workers: int | None = None, streaming: bool = False, direct: bool = False):
+    """
+    Harmonise every dataset and write the processed files.
+
+    Runs as a pipeline, so one dataset is read while the previous one is harmonised (across `n_workers` processes)
+    and the one before that is written. With `streaming`, runs `main_streaming` instead.
+    With `direct`, the files are decoded without the pandas intermediate (see `sav.load_data`).
+    """
+    if streaming:
+        return main_streaming()
+
+    # Fail on any missing columns before reading data, and chunk each dataset by its share of the total work
+    n_chunks = dict(plan(DATASETS, INTERIM_DATA, "harmonise", n_workers).select("dataset", "chunks").iter_rows())
+
+    # Content fingerprints of the files written by the last run, so unchanged files aren't rewritten
+    manifest = json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+
+    def read(dset):
+        return read_data(DATASETS[dset]["file"], INTERIM_DATA, direct, n_workers)
+
+    def harmonise(dset, data):
+        df, meta = data
+        return harmonise_all({dset: df}, n_workers, pool, {dset: n_chunks[dset]})[dset], meta
+
+    def write(dset, data):
+        harmonised_df, meta = data
+        file = DATASETS[dset]["file"]
+        new_meta = LONG_METADATA if dset == "G217" else METADATA
 
         harmonised_lf = harmonised_df.lazy()
         harmonised_meta = update_metadata(harmonised_lf, meta, new_meta)
 
+        fingerprint = content_fingerprint(harmonised_lf, harmonised_meta)
+        if manifest.get(file) == fingerprint and (PROCESSED_DATA/file).exists():
+            return
+
         write_sav(PROCESSED_DATA/file, harmonised_lf, harmonised_meta)
+        row_hashes(harmonised_lf).write_parquet(hashes_path(PROCESSED_DATA/file))
+
+        manifest[file] = fingerprint
+        MANIFEST.write_text(json.dumps(manifest, indent=4))
+
+    with worker_pool(n_workers) as pool:
+        run_pipeline(DATASETS, read, harmonise, write)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # `python main.py --direct` decodes the interim files without the pandas intermediate
+    main(direct="--direct" in sys.argv[1:])
\ No newline at end of file
@@ -1,6 +1,9 @@
-from odyssey.core import Dataset, write_sav
+from odyssey.core import write_sav
+from sav import load_data
+from plan import plan
 from config import RAW_DATA, INTERIM_DATA, DATASETS
 
+import sys
 from typing import Any
 
 def rename_metadata_variables(
@@ -27,7 +30,9 @@ def _rename_field_variables(
 
 def create_interim_spss_files(
     config: dict[str, Any],
-    dataset: str
+    dataset: str,
+    direct: bool = False, # decode without the pandas intermediate, across processes for large files; see `sav.load_data`
+    n_workers: int | None = None,
 ) -> None:
     """
     Apply changes to create interim files by renaming and deleting specified variables.
@@ -35,8 +40,7 @@ def create_interim_spss_files(
     dset = _get_dataset_from_config(config, dataset)
     file, vars_to_delete, vars_to_rename = dset.get("file"), dset.get("delete"), dset.get("rename")
     
-    data = Dataset(file, RAW_DATA)
-    lf, meta = data.load_data()
+    lf, meta = load_data(file, RAW_DATA, n_workers, direct)
 
     harmonised_lf = (
         lf
@@ -58,5 +62,7 @@ def _get_dataset_from_config(
 
 
 if __name__ == "__main__":
+    # `python make_interim.py --direct` decodes the raw files without the pandas intermediate
+    plan(DATASETS, RAW_DATA, "interim")
     for dataset in DATASETS:
-        create_interim_spss_files(DATASETS, dataset=dataset)
\ No newline at end of file
+        create_interim_spss_files(DATASETS, dataset=dataset, direct="--direct" in sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,89 @@
+import sys
+from functools import reduce
+from pathlib import Path
+
+import polars as pl
+
+from sav import load_data
+from config import DATASETS, PROCESSED_DATA
+
+# The waves of the panel, in the order they were collected
+WAVES = ["G126", "G217", "G220", "G222", "G227", "G228"]
+
+# The harmonised IPAQ columns of every wave, ie. `G220_IPAQ_VIG_MINS`; a wave without one (G217 has no VIG_MINS,
+# only its domains' MINS) has it as null
+measures = [f"IPAQ_{cat}_{col}" for cat in ["VIG", "MOD", "WALK"] for col in ["MINS", "MET"]] + ["IPAQ_TOT_MET", "IPAQ_CAT"]
+# IPAQ_CAT is a category code (0, 1 or 2), which harmonising leaves as Int32; the SAV files store every column as Float64
+dtypes = {measure: pl.Int32 if measure == "IPAQ_CAT" else pl.Float64 for measure in measures}
+
+def scan_wave(
+    dset: str,
+    directory: Path = PROCESSED_DATA,
+) -> pl.LazyFrame:
+    """
+    The harmonised IPAQ columns of a wave, by `ID`: the Parquet file written by `main_streaming` if there is one,
+    otherwise the SAV file written by `main`.
+
+    `make_interim` sorts every wave by `ID`, and harmonising keeps the order, but the flag saying so is lost
+    in the file; so the order is checked here, and `ID` is flagged as sorted for `build_panel`'s merge joins.
+    """
+    file = directory / DATASETS[dset]["file"]
+    if file.with_suffix(".parquet").exists():
+        lf = pl.scan_parquet(file.with_suffix(".parquet"))
+    else:
+        lf, _ = load_data(file.name, directory)
+
+    columns = lf.collect_schema().names()
+    lf = lf.select("ID", *(
+        pl.col(f"{dset}_{measure}").cast(dtypes[measure]) if f"{dset}_{measure}" in columns
+        else pl.lit(None, dtypes[measure]).alias(f"{dset}_{measure}")
+        for measure in measures
+    ))
+
+    if not lf.select("ID").collect().to_series().is_sorted():
+        raise ValueError(f"{dset} isn't sorted by ID, so it can't be merge joined; rerun make_interim")
+    return lf.with_columns(pl.col("ID").set_sorted())
+
+def build_panel(
+    waves: dict[str, pl.LazyFrame] | None = None, # each from `scan_wave`, defaults to every one of `WAVES`
+    how: str = "wide", # or "long"
+) -> pl.LazyFrame:
+    """
+    The panel of every participant's harmonised IPAQ measures across the waves, as a LazyFrame sorted by `ID`.
+
+    `how="wide"` has one row per participant, with each wave's columns (ie. `G126_IPAQ_TOT_MET`, `G220_IPAQ_TOT_MET`),
+    null in the waves they weren't in. `how="long"` has one row per participant and wave they were in,
+    with a `wave` column and the columns without the prefix (ie. `IPAQ_TOT_MET`), sorted by `ID` then wave.
+
+    As every wave is sorted by `ID`, the wide panel needs no hash join: the waves' IDs are merged into the sorted IDs
+    of every participant, and each wave is left joined onto them, which Polars does as a merge join
+    when both keys are flagged as sorted.
+    """
+    waves = waves or {dset: scan_wave(dset) for dset in WAVES}
+
+    if how == "long":
+        long_waves = [
+            lf.select(
+                "ID",
+                pl.lit(dset, pl.Enum(list(waves))).alias("wave"),
+                *(pl.col(f"{dset}_{measure}").cast(dtypes[measure]).alias(measure) for measure in measures),
+            )
+            for dset, lf in waves.items()
+        ]
+        # Merging the waves with `merge_sorted` is about three times slower than sorting them, as it copies every row
+        # at each of the merges; the sort is stable, so the rows of a participant stay in the order of `waves`
+        return pl.concat(long_waves).sort("ID", maintain_order=True)
+    elif how != "wide":
+        raise ValueError(f"Unknown panel {how}, expected wide or long")
+
+    ids = reduce(lambda left, right: left.merge_sorted(right, "ID"), (lf.select("ID") for lf in waves.values()))
+    # The IDs are sorted, so the duplicates (participants in more than one wave) are adjacent
+    panel = ids.filter(pl.col("ID").ne_missing(pl.col("ID").shift())).with_columns(pl.col("ID").set_sorted())
+    for lf in waves.values():
+        panel = panel.join(lf, on="ID", how="left")
+    return panel
+
+if __name__ == "__main__":
+    # `python panel.py [wide|long]` writes the panel for the longitudinal analyses, ie. `IPAQ_panel_wide.parquet`
+    how = sys.argv[1] if len(sys.argv) > 1 else "wide"
+    build_panel(how=how).sink_parquet(PROCESSED_DATA / f"IPAQ_panel_{how}.parquet")
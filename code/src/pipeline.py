@@ -0,0 +1,80 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable
+
+_DONE = object()
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    "Put `item` on the bounded queue `q`, waiting for space unless the pipeline has stopped."
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    "Get the next item from `q`, or `_DONE` if the pipeline has stopped."
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _DONE
+
+def run_pipeline[K, R, H](
+    keys: Iterable[K],
+    read: Callable[[K], R],
+    process: Callable[[K, R], H],
+    write: Callable[[K, H], None],
+    buffer: int = 1, # items held between stages, which caps memory at about 2 * buffer + 3 items
+) -> None:
+    """
+    Run `read`, `process` and `write` over `keys` as three overlapping stages:
+    a reader thread reads item N+1 while item N is processed on this thread and a writer thread writes item N-1.
+
+    The stages are joined by bounded queues, so a slow stage holds up the ones before it (backpressure).
+    An exception in any stage stops the others and is raised here.
+    """
+    decoded, processed = queue.Queue(buffer), queue.Queue(buffer)
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            for key in keys:
+                if not _put(decoded, (key, read(key)), stop):
+                    return
+            _put(decoded, _DONE, stop)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def writer():
+        try:
+            while (item := _get(processed, stop)) is not _DONE:
+                write(*item)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while (item := _get(decoded, stop)) is not _DONE:
+            key, data = item
+            if not _put(processed, (key, process(key, data)), stop):
+                break
+        _put(processed, _DONE, stop)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
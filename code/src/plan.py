@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from rule_tree import input_columns
+from sav import read_sav_metadata
+from schedule import chunk_counts, dataset_stages
+
+def read_headers(
+    files: dict[str, Path],
+) -> dict[str, tuple[dict[str, dict[str, Any]], int]]:
+    "Read the metadata and number of rows of each file, without any data, in parallel."
+    with ThreadPoolExecutor() as pool:
+        return dict(zip(files, pool.map(read_sav_metadata, files.values())))
+
+def missing_harmonise_columns(
+    dset: str,
+    columns: list[str], # the dataset's columns
+) -> list[str]:
+    """
+    The columns which harmonising `dset` reads (including `sorted_columns` for G217) but which aren't in `columns`.
+
+    Compares `columns` with the columns each stage's expressions read (see `rule_tree.input_columns`),
+    less those which an earlier stage creates, so every missing column is found without reading any data.
+    """
+    stages, output = dataset_stages(dset, columns)
+    available = set(columns)
+    missing = {}
+    for stage in stages:
+        for expr in stage:
+            missing.update(dict.fromkeys(column for column in input_columns(expr) if column not in available))
+        available |= {expr.meta.output_name() for expr in stage}
+    # G217 selects `sorted_columns`, which aren't all read by the stages
+    missing.update(dict.fromkeys(column for column in output if column not in available))
+    return list(missing)
+
+def _check_interim(dset: str, config: dict[str, Any], meta: dict[str, dict[str, Any]]) -> list[str]:
+    "Check that the columns to rename and delete in a raw file exist."
+    columns = meta["label"]
+    return [
+        f"{dset}: column to {action} {column} not found"
+        for action, names in [("rename", config.get("rename", {})), ("delete", config.get("delete", []))]
+        for column in names if column not in columns
+    ]
+
+def _check_harmonise(dset: str, config: dict[str, Any], meta: dict[str, dict[str, Any]]) -> list[str]:
+    "Check that an interim file has every column which harmonisation reads."
+    return [f"{dset}: column {column} not found" for column in missing_harmonise_columns(dset, list(meta["label"]))]
+
+def plan(
+    datasets: dict[str, dict[str, Any]], # ie. `DATASETS`
+    directory: Path,
+    stage: str = "harmonise", # "interim" checks raw files for `make_interim`, "harmonise" checks interim files for `main`
+    n_workers: int | None = None, # defaults to the number of CPUs
+) -> pl.DataFrame:
+    """
+    Check every dataset's columns from the SAV headers alone, before any data is read,
+    raising a ValueError listing every problem. Otherwise returns the execution plan:
+    the size of each dataset, and how many chunks it is harmonised in.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    headers = read_headers({dset: directory/config["file"] for dset, config in datasets.items()})
+
+    check = _check_interim if stage == "interim" else _check_harmonise
+    problems = [problem for dset, (meta, _) in headers.items() for problem in check(dset, datasets[dset], meta)]
+    if problems:
+        raise ValueError("\n".join(["Schema drift in the input files:", *problems]))
+
+    costs = {dset: n_rows * len(meta["label"]) for dset, (meta, n_rows) in headers.items()}
+    # `main` harmonises one dataset at a time, so each is split across every worker, however small
+    n_chunks = chunk_counts(costs, n_workers, min_chunks=n_workers)
+    return pl.DataFrame(
+        [
+            {
+                "dataset": dset,
+                "file": datasets[dset]["file"],
+                "rows": n_rows,
+                "columns": len(meta["label"]),
+                "cells": costs[dset],
+                "chunks": n_chunks[dset],
+            }
+            for dset, (meta, n_rows) in headers.items()
+        ]
+    ).sort("cells", descending=True)
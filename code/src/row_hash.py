@@ -0,0 +1,105 @@
+import hashlib
+import json
+from pathlib import Path
+
+import polars as pl
+
+HASH = "ROW_HASH"
+IPAQ_COLUMNS = r"^.*_IPAQ_.*$"
+_ROW = "__row"
+
+# Constants from splitmix64; the arithmetic below wraps at 64 bits
+_MIX_1 = 0xBF58476D1CE4E5B9
+_MIX_2 = 0x94D049BB133111EB
+_NULL = 0x9E3779B97F4A7C15
+_FRACTION_BITS = 2**52
+
+def _u64(value: int) -> pl.Expr:
+    return pl.lit(value, dtype=pl.UInt64)
+
+def _salt(column: str) -> int:
+    "A fixed 64-bit salt per column name, so equal values in different columns hash differently."
+    return int.from_bytes(hashlib.blake2b(column.encode(), digest_size=8).digest(), "little")
+
+def _mix(lf: pl.LazyFrame, columns: list[str]) -> pl.LazyFrame:
+    "Apply the splitmix64 finaliser to each UInt64 column, one step at a time so the columns are referenced by name."
+    for shift, factor in [(30, _MIX_1), (27, _MIX_2)]:
+        lf = lf.with_columns(((pl.col(c) ^ (pl.col(c) // _u64(2**shift))) * _u64(factor)).alias(c) for c in columns)
+    return lf.with_columns((pl.col(c) ^ (pl.col(c) // _u64(2**31))).alias(c) for c in columns)
+
+def with_row_hash(
+    lf: pl.LazyFrame | pl.DataFrame,
+    columns: str | list[str] = IPAQ_COLUMNS, # column names, or a regex as in `pl.col`
+) -> pl.LazyFrame:
+    """
+    Add a 64-bit hash of each row's values in `columns` as `ROW_HASH`.
+
+    The hash only uses integer arithmetic defined here, not Polars' own hashing,
+    so it is the same across Polars versions and platforms and can be stored.
+    Values are hashed as Float64 (ints and floats which are equal hash the same),
+    to a resolution of 2^-52 of their fractional part, and nulls, NaN and infinite
+    values all hash as null, as do finite values outside the Int64 range (ie. 2^70),
+    which IPAQ answers never reach. Column order does not matter.
+    """
+    lf = lf.lazy()
+    columns = sorted(lf.select(pl.col(columns)).collect_schema().names())
+    whole = [f"__whole_{i}" for i in range(len(columns))]
+    fraction = [f"__fraction_{i}" for i in range(len(columns))]
+
+    finite = [pl.col(c).cast(pl.Float64).fill_nan(None) for c in columns]
+    finite = [pl.when(v.is_finite()).then(v) for v in finite]
+    hashed = lf.with_columns(
+        *[v.floor().cast(pl.Int64, strict=False).reinterpret(signed=False).alias(w) for v, w in zip(finite, whole)],
+        *[((v - v.floor()) * _FRACTION_BITS).cast(pl.Int64, strict=False).reinterpret(signed=False).alias(f) for v, f in zip(finite, fraction)],
+    )
+    hashed = _mix(hashed.with_columns(pl.col(w) + _u64(_salt(c)) for c, w in zip(columns, whole)), whole)
+    hashed = _mix(hashed.with_columns(pl.col(w) ^ pl.col(f) for w, f in zip(whole, fraction)), whole)
+    hashed = hashed.with_columns(
+        pl.col(w).fill_null(_u64(_salt(c) ^ _NULL)) for c, w in zip(columns, whole)
+    )
+
+    return _mix(hashed.with_columns(pl.sum_horizontal(whole).alias(HASH)), [HASH]).drop(*whole, *fraction)
+
+def row_hashes(
+    lf: pl.LazyFrame | pl.DataFrame,
+    columns: str | list[str] = IPAQ_COLUMNS,
+    id_column: str = "ID",
+) -> pl.DataFrame:
+    "The `ROW_HASH` of each row in `lf`, keyed by `id_column`."
+    return with_row_hash(lf, columns).select(id_column, HASH).collect(streaming=True)
+
+def hashes_path(file: Path) -> Path:
+    "Where the row hashes of a processed file are stored, ie. `G217_TeenQ_hashes.parquet`."
+    return file.with_name(f"{file.stem}_hashes.parquet")
+
+def column_fingerprints(
+    lf: pl.LazyFrame | pl.DataFrame,
+    columns: list[str],
+) -> dict[str, str]:
+    """
+    Fingerprint each column from its dtype and a hash of its values in row order, in one streaming pass.
+
+    Row order is part of the fingerprint, so reordered rows count as a change.
+    """
+    lf = lf.lazy().select(columns)
+    schema = lf.collect_schema()
+    hashes = (
+        lf.with_row_index(_ROW)
+        .select(pl.len().alias(_ROW), *[pl.struct(_ROW, column).hash(seed=0).sum().alias(column) for column in columns])
+        .collect(streaming=True)
+        .row(0, named=True)
+    )
+    return {column: f"{schema[column]}:{hashes[_ROW]}:{hashes[column]}" for column in columns}
+
+def content_fingerprint(
+    lf: pl.LazyFrame | pl.DataFrame,
+    metadata: dict, # ie. the `MetadataDict` passed to `write_sav`
+) -> str:
+    """
+    Fingerprint everything written to a SAV file: the values and dtypes of every column in order, and the metadata.
+
+    Uses `column_fingerprints`, so it is only comparable between runs with the same Polars version.
+    """
+    lf = lf.lazy()
+    key = [pl.__version__, column_fingerprints(lf, lf.collect_schema().names()), metadata]
+    return hashlib.sha256(json.dumps(key, default=str).encode()).hexdigest()
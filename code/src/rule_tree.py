@@ -0,0 +1,52 @@
+import io
+import json
+from typing import Any
+
+import polars as pl
+
+def expression_tree(expr: pl.Expr) -> dict:
+    "The tree of a Polars expression, as serialised by Polars."
+    return json.loads(expr.meta.serialize(format="json"))
+
+def literal_value(node: dict) -> Any:
+    "The value of a `Literal` node, with Polars evaluating it (ie. the list in `is_in`)."
+    if node["Literal"] == "Null":
+        return None
+    expr = pl.Expr.deserialize(io.StringIO(json.dumps(node)), format="json")
+    values = pl.select(expr).to_series()
+    return values.to_list() if len(values) != 1 or values.dtype.is_nested() else values.item()
+
+def function_name(function: str | dict) -> tuple[str, Any]:
+    "The name and options of a `Function` node's function, ie. `Boolean: {IsIn: ...}` is `IsIn`."
+    name, options = (function, None) if isinstance(function, str) else next(iter(function.items()))
+    if name == "Boolean":
+        return function_name(options)
+    return name, options
+
+def function_inputs(nodes: list[dict]) -> list[dict]:
+    "The inputs of a `Function` node, expanding `pl.col(a, b)` into a `Column` node for each column."
+    return [
+        expanded
+        for node in nodes
+        for expanded in ([{"Column": name} for name in node["Columns"]] if "Columns" in node else [node])
+    ]
+
+def input_columns(expr: pl.Expr) -> list[str]:
+    "The columns `expr` reads; unlike `expr.meta.root_names()`, including those of `pl.col(a, b)`."
+    columns = {}
+
+    def walk(node: Any):
+        if isinstance(node, list):
+            for value in node:
+                walk(value)
+        elif isinstance(node, dict):
+            if isinstance(node.get("Column"), str):
+                columns[node["Column"]] = None
+            elif "Columns" in node:
+                columns.update(dict.fromkeys(node["Columns"]))
+            else:
+                for value in node.values():
+                    walk(value)
+
+    walk(expression_tree(expr))
+    return list(columns)
@@ -0,0 +1,111 @@
+import os
+import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+import pyreadstat
+from odyssey.core import Dataset
+
+# With `load_data(direct=True)`, files with more cells than this are decoded across processes
+PARALLEL_CELLS = 20_000_000
+
+def read_sav_metadata(path: Path) -> tuple[dict[str, dict[str, Any]], int]:
+    """
+    Read the metadata of a SAV file without its data, in the same structure as `Dataset.load_data`
+    (the fields of `odyssey.core.Metadata`, each mapping variable names to values), and the number of rows.
+    """
+    _, sav_meta = pyreadstat.read_sav(path, metadataonly=True)
+
+    meta = {
+        "label": {},
+        "field_type": {},
+        "field_values": {},
+        "field_width": {},
+        "decimals": {},
+        "variable_type": {},
+    }
+    for variable in sav_meta.column_names:
+        # SPSS formats are ie. `F8.2` (numeric, width 8, 2 decimals) or `A20` (a string of width 20)
+        spss_format = re.match(r"([A-Z]+)(\d+)(?:\.(\d+))?", sav_meta.original_variable_types[variable])
+        meta["label"][variable] = sav_meta.column_names_to_labels.get(variable) or ""
+        meta["field_type"][variable] = "String" if spss_format.group(1) == "A" else "Numeric"
+        meta["field_values"][variable] = sav_meta.variable_value_labels.get(variable, {})
+        meta["field_width"][variable] = int(spss_format.group(2))
+        meta["decimals"][variable] = int(spss_format.group(3) or 0)
+        meta["variable_type"][variable] = sav_meta.variable_measure.get(variable, "unknown")
+
+    return meta, sav_meta.number_rows
+
+def _read_rows(
+    path: Path,
+    row_offset: int = 0,
+    row_limit: int = 0, # 0 reads every row
+) -> pl.DataFrame:
+    """
+    Decode rows of a SAV file straight into Polars, with SPSS missing values (NaN) as nulls.
+
+    pyreadstat (1.2, as pinned) decodes into one NumPy array per column; each is released as soon as it is converted,
+    so peak memory is the decoded data plus one column, rather than the two full copies made via pandas.
+    """
+    data, _ = pyreadstat.read_sav(path, row_offset=row_offset, row_limit=row_limit, output_format="dict")
+    return pl.DataFrame([pl.Series(column, data.pop(column), nan_to_null=True) for column in list(data)])
+
+def read_sav_parallel(
+    path: Path,
+    n_rows: int,
+    n_workers: int,
+) -> pl.DataFrame:
+    """
+    Decode a SAV file in `n_workers` row ranges across processes, concatenated in row order.
+
+    Equivalent to `pyreadstat.read_file_multiprocessing`, but each worker returns a Polars frame
+    rather than pandas, and the workers are spawned rather than forked (Polars is multithreaded).
+    """
+    chunk = -(-n_rows // n_workers)
+    with ProcessPoolExecutor(n_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        chunks = pool.map(_read_rows, [path] * n_workers, range(0, n_rows, chunk), [chunk] * n_workers)
+        return pl.concat(list(chunks))
+
+def load_data(
+    file: str,
+    directory: Path,
+    n_workers: int | None = None, # defaults to the number of CPUs
+    direct: bool = False,
+) -> tuple[pl.LazyFrame, dict[str, dict[str, Any]]]:
+    """
+    `Dataset(file, directory).load_data()`.
+
+    With `direct`, the data is decoded straight into Polars instead, without the pandas intermediate,
+    and files with more than `PARALLEL_CELLS` cells are decoded across processes. This isn't checked against odyssey:
+    the metadata is rebuilt from the header (see `read_sav_metadata`) and every numeric column is Float64,
+    so either can differ from `Dataset.load_data`'s.
+    """
+    if not direct:
+        return Dataset(file, directory).load_data()
+
+    n_workers = n_workers or os.cpu_count() or 1
+    meta, n_rows = read_sav_metadata(directory/file)
+
+    if n_workers == 1 or n_rows * len(meta["label"]) < PARALLEL_CELLS:
+        return _read_rows(directory/file).lazy(), meta
+
+    return read_sav_parallel(directory/file, n_rows, n_workers).lazy(), meta
+
+def scan_sav(
+    path: Path,
+    staging: Path, # an empty directory for the Parquet chunks
+    chunk_rows: int = 100_000,
+) -> pl.LazyFrame:
+    """
+    Scan a SAV file lazily, by decoding it `chunk_rows` at a time to Parquet in `staging`.
+
+    pyreadstat can only decode SAV files into memory, so this stages them in a format
+    the Polars streaming engine can read chunk by chunk (it can't stream IPC scans).
+    """
+    _, n_rows = read_sav_metadata(path)
+    for i, offset in enumerate(range(0, max(n_rows, 1), chunk_rows)):
+        _read_rows(path, offset, chunk_rows).write_parquet(staging / f"{i:05}.parquet")
+    return pl.scan_parquet(staging / "*.parquet")
@@ -0,0 +1,124 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import polars as pl
+
+import harmonise
+import harmonise_long
+from harmonise import harmonise_ipaq, clean_sit_variables, recalculate_sit_trunc
+from harmonise_long import harmonise_ipaq_long
+
+def harmonise_dataset(
+    dset: str,
+    df: pl.DataFrame | pl.LazyFrame,
+    streaming: bool = False, # see `harmonise_ipaq`
+) -> pl.DataFrame | pl.LazyFrame:
+    "Harmonise a dataset, or any chunk of its rows, as `main` does."
+    if dset == "G217":
+        harmonised_df = harmonise_ipaq_long(dset, df, streaming)
+    else:
+        harmonised_df = harmonise_ipaq(dset, df, streaming)
+
+    # Additional cleaning required for G222 and G126 for SIT variables
+    if dset in ["G222", "G126"]:
+        harmonised_df = (
+            harmonised_df
+            .with_columns(clean_sit_variables(dset))
+            .with_columns(recalculate_sit_trunc(dset))
+        )
+
+    return harmonised_df
+
+def dataset_stages(
+    dset: str,
+    columns: list[str], # the columns of the dataset
+) -> tuple[list[list[pl.Expr]], list[str]]:
+    """
+    The `with_columns` stages which `harmonise_dataset` applies to `dset`, and the columns it outputs,
+    for backends which run the rules outside of Polars.
+    """
+    if dset == "G217":
+        return harmonise_long.harmonise_stages(dset), harmonise_long.sorted_columns
+
+    stages = harmonise.harmonise_stages(dset)
+    # Additional cleaning required for G222 and G126 for SIT variables
+    if dset in ["G222", "G126"]:
+        stages += [clean_sit_variables(dset), recalculate_sit_trunc(dset)]
+
+    created = [expr.meta.output_name() for stage in stages for expr in stage]
+    output = list(dict.fromkeys(columns + created))
+    return stages, [column for column in output if column not in harmonise.dropped_columns]
+
+@dataclass
+class Task:
+    dset: str
+    chunk: int # position of the rows in the dataset
+    df: pl.DataFrame
+
+    @property
+    def cost(self) -> int:
+        "Harmonisation time is roughly proportional to the number of cells."
+        return self.df.height * self.df.width
+
+def chunk_counts(
+    costs: dict[str, int], # ie. rows * columns per dataset
+    n_workers: int,
+    tasks_per_worker: int = 4,
+    min_chunks: int = 1, # ie. `n_workers`, when each dataset is harmonised on its own
+) -> dict[str, int]:
+    """
+    The number of row chunks to split each dataset into.
+
+    Datasets costing more than an even share of the total (over `n_workers * tasks_per_worker` tasks)
+    are split into chunks of about that share; smaller datasets are one task each, or `min_chunks`.
+    """
+    share = max(sum(costs.values()) // (n_workers * tasks_per_worker), 1)
+    return {dset: max(math.ceil(cost / share), min_chunks) for dset, cost in costs.items()}
+
+def plan_tasks(
+    datasets: dict[str, pl.DataFrame],
+    n_workers: int,
+    n_chunks: dict[str, int] | None = None, # defaults to `chunk_counts` over `datasets`
+) -> list[Task]:
+    "Split the datasets into tasks of similar cost (see `chunk_counts`), largest first."
+    n_chunks = n_chunks or chunk_counts({dset: df.height * df.width for dset, df in datasets.items()}, n_workers)
+
+    tasks = []
+    for dset, df in datasets.items():
+        rows = math.ceil(df.height / n_chunks[dset]) or 1
+        tasks += [Task(dset, i, chunk) for i, chunk in enumerate(df.iter_slices(rows))]
+
+    return sorted(tasks, key=lambda task: task.cost, reverse=True)
+
+def worker_pool(n_workers: int | None = None) -> ProcessPoolExecutor:
+    "A pool of harmonisation workers; Polars is multithreaded, so workers are spawned rather than forked."
+    return ProcessPoolExecutor(n_workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+
+def harmonise_all(
+    datasets: dict[str, pl.DataFrame],
+    n_workers: int | None = None, # defaults to the number of CPUs
+    pool: ProcessPoolExecutor | None = None, # an existing pool from `worker_pool`, with `n_workers` workers
+    n_chunks: dict[str, int] | None = None, # ie. from `plan.plan`, see `plan_tasks`
+) -> dict[str, pl.DataFrame]:
+    """
+    Harmonise every dataset across a pool of worker processes, reassembling chunked datasets in row order.
+
+    Idle workers take the next task from the pool's shared queue, and the largest tasks are queued first,
+    so a wide dataset like G217 is spread across the workers instead of finishing on one core after the rest.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    if pool is None:
+        with worker_pool(n_workers) as pool:
+            return harmonise_all(datasets, n_workers, pool, n_chunks)
+
+    tasks = plan_tasks(datasets, n_workers, n_chunks)
+    futures = [(task.dset, task.chunk, pool.submit(harmonise_dataset, task.dset, task.df)) for task in tasks]
+    chunks = [(dset, chunk, future.result()) for dset, chunk, future in futures]
+
+    return {
+        dset: pl.concat([df for d, _, df in sorted(chunks, key=lambda c: c[1]) if d == dset])
+        for dset in datasets
+    }
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import polars as pl
+import pyarrow as pa
+
+from schedule import harmonise_dataset
+
+type Record = dict[str, Any]
+
+HOST = "127.0.0.1" # the service only listens locally
+PORT = 8765
+
+def harmonise_batch(dset: str, records: list[Record]) -> list[Record]:
+    "Harmonise a micro-batch of records as one Arrow table, as `harmonise_dataset` would the rows of a dataset."
+    df = pl.from_arrow(pa.Table.from_pylist(records))
+    # A column which is null in every record of the batch has no type, but is numeric in the data
+    return harmonise_dataset(dset, df.with_columns(pl.col(pl.Null).cast(pl.Float64))).to_dicts()
+
+def harmonise_each(dset: str, records: list[Record]) -> list[Record | Exception]:
+    "Harmonise each record as a batch of one, returning the exception for any which fail."
+    results = []
+    for record in records:
+        try:
+            results += harmonise_batch(dset, [record])
+        except Exception as e:
+            results.append(e)
+    return results
+
+def percentile(values: list[float], q: float) -> float | None:
+    "The `q`th percentile (0-100) of `values`, by the nearest rank."
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+def percentile_ms(latencies: list[float], q: float) -> float | None:
+    "The `q`th percentile of `latencies` (in seconds), in milliseconds."
+    value = percentile(latencies, q)
+    return None if value is None else value * 1000
+
+@dataclass
+class Metrics:
+    "Latencies (from a record arriving to it being scored) and batch sizes, over the latest `window` of each."
+    window: int = 10_000
+    requests: int = 0
+    batches: int = 0
+    latencies: deque[float] = field(init=False)
+    batch_sizes: deque[int] = field(init=False)
+
+    def __post_init__(self):
+        self.latencies = deque(maxlen=self.window)
+        self.batch_sizes = deque(maxlen=self.window)
+
+    def add_batch(self, latencies: list[float]):
+        self.requests += len(latencies)
+        self.batches += 1
+        self.latencies.extend(latencies)
+        self.batch_sizes.append(len(latencies))
+
+    def summary(self) -> dict[str, Any]:
+        latencies, sizes = list(self.latencies), list(self.batch_sizes)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "p50_ms": percentile_ms(latencies, 50),
+            "p99_ms": percentile_ms(latencies, 99),
+            "mean_batch_size": sum(sizes) / len(sizes) if sizes else None,
+            "max_batch_size": max(sizes, default=None),
+        }
+
+class MicroBatcher:
+    """
+    Coalesces records submitted one at a time into micro-batches per dataset, harmonising a batch once it has
+    `max_batch` records or its first record has waited `max_delay` seconds, whichever is first.
+
+    Batches are harmonised in `executor` (one thread by default, as Polars is multithreaded),
+    so the event loop keeps accepting records, which queue into the next batch.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 512,
+        max_delay: float = 0.005,
+        executor: Executor | None = None,
+    ):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.executor = executor or ThreadPoolExecutor(1)
+        self.metrics = Metrics()
+        self._pending: dict[str, list[tuple[Record, asyncio.Future, float]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._running: set[asyncio.Task] = set()
+
+    async def submit(self, dset: str, record: Record) -> Record:
+        "Harmonise one record of `dset` in the next batch."
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(dset, [])
+        pending.append((record, future, time.perf_counter()))
+
+        if len(pending) >= self.max_batch:
+            self._flush(dset)
+        elif len(pending) == 1:
+            self._timers[dset] = loop.call_later(self.max_delay, self._flush, dset)
+        return await future
+
+    def _flush(self, dset: str):
+        if timer := self._timers.pop(dset, None):
+            timer.cancel()
+        if batch := self._pending.pop(dset, None):
+            task = asyncio.create_task(self._run(dset, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, dset: str, batch: list[tuple[Record, asyncio.Future, float]]):
+        records = [record for record, _, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, harmonise_batch, dset, records)
+        except Exception:
+            # One bad record (ie. a value of the wrong type) fails the whole batch,
+            # so harmonise each record alone, and only fail the bad ones
+            results = await loop.run_in_executor(self.executor, harmonise_each, dset, records)
+
+        done = time.perf_counter()
+        for (_, future, _), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self.metrics.add_batch([done - arrived for _, _, arrived in batch])
+
+async def _handle(batcher: MicroBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """
+    Serve one connection. Each line is a JSON request: `{"dataset": "G220", "record": {...}}` is answered with
+    `{"record": {...}}` (the harmonised record) or `{"error": "..."}`, and `{"metrics": null}` with `Metrics.summary`.
+    A line which isn't a valid request is answered with `{"error": "..."}`.
+    Requests can be pipelined, and are answered in order.
+    """
+    responses: asyncio.Queue[asyncio.Future | None] = asyncio.Queue()
+
+    async def respond(line: bytes) -> dict[str, Any]:
+        try:
+            request = json.loads(line)
+            if "metrics" in request:
+                return batcher.metrics.summary()
+            return {"record": await batcher.submit(request["dataset"], request["record"])}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    async def write():
+        while (response := await responses.get()) is not None:
+            writer.write(json.dumps(await response).encode() + b"\n")
+            await writer.drain()
+
+    writing = asyncio.create_task(write())
+    try:
+        while line := await reader.readline():
+            await responses.put(asyncio.ensure_future(respond(line)))
+    finally:
+        await responses.put(None)
+        await writing
+        writer.close()
+
+async def serve(
+    host: str = HOST,
+    port: int = PORT,
+    batcher: MicroBatcher | None = None,
+) -> asyncio.Server:
+    "Start the scoring service on `host:port` (see `_handle` for the protocol)."
+    batcher = batcher or MicroBatcher()
+    return await asyncio.start_server(lambda r, w: _handle(batcher, r, w), host, port)
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, message: dict[str, Any]) -> dict[str, Any]:
+    "Send one request on a connection to the service, returning its response."
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+async def load_test(
+    dset: str,
+    records: list[Record], # ie. rows of the interim dataset, sampled with replacement
+    n_requests: int = 10_000,
+    concurrency: int = 64, # the number of clients, each sending its next record once the last is scored
+    host: str = HOST,
+    port: int = PORT,
+) -> dict[str, Any]:
+    """
+    Generate load against a running service, returning the latency and throughput seen by the clients,
+    and the service's own metrics.
+    """
+    latencies = []
+    remaining = iter(range(n_requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await request(reader, writer, {"dataset": dset, "record": random.choice(records)})
+            latencies.append(time.perf_counter() - start)
+            if "error" in response:
+                raise RuntimeError(response["error"])
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    service = await request(reader, writer, {"metrics": None})
+    writer.close()
+
+    return {
+        "requests_per_second": n_requests / elapsed,
+        "client_p50_ms": percentile_ms(latencies, 50),
+        "client_p99_ms": percentile_ms(latencies, 99),
+        "service": service,
+    }
+
+async def benchmark(
+    dset: str,
+    records: list[Record],
+    n_requests: int = 10_000,
+    concurrency: int = 64,
+    batcher: MicroBatcher | None = None,
+) -> dict[str, Any]:
+    "Run the service and the load generator against it together, on localhost (see `load_test`)."
+    server = await serve(batcher=batcher)
+    async with server:
+        return await load_test(dset, records, n_requests, concurrency)
+
+if __name__ == "__main__":
+    # `python service.py serve [port]` runs the service,
+    # `python service.py bench G220 [n_requests] [concurrency]` benchmarks it with the rows of the interim dataset
+    if sys.argv[1] == "serve":
+        async def run():
+            server = await serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else PORT)
+            async with server:
+                await server.serve_forever()
+        asyncio.run(run())
+    else:
+        from sav import load_data
+        from config import DATASETS, INTERIM_DATA
+
+        dset = sys.argv[2]
+        lf, _ = load_data(DATASETS[dset]["file"], INTERIM_DATA)
+        records = lf.collect().to_dicts()
+        print(json.dumps(asyncio.run(benchmark(dset, records, *map(int, sys.argv[3:]))), indent=2))
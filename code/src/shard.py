@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import polars as pl
+
+from row_hash import HASH, with_row_hash
+from schedule import harmonise_dataset
+
+# A shard moves from pending/ to claimed/ when a worker takes it, and its output is published to done/
+QUEUE_DIRS = ["pending", "claimed", "done"]
+
+def shard_by_id(
+    df: pl.DataFrame,
+    n_shards: int,
+    id_column: str = "ID",
+) -> list[pl.DataFrame]:
+    "Partition `df` into at most `n_shards` by a stable hash of `id_column`, keeping the row order within each."
+    shard = with_row_hash(df, [id_column]).select(pl.col(HASH) % n_shards).collect().to_series()
+    return df.with_columns(shard.alias("__shard")).partition_by("__shard", include_key=False)
+
+def work(
+    queue: Path,
+    prefix: str,
+) -> None:
+    """
+    Harmonise shards from the queue until none are pending.
+
+    Claiming a shard is an atomic rename, so any number of workers (on any machine sharing `queue`) can run at once.
+    """
+    for name in sorted(os.listdir(queue / "pending")):
+        claimed = queue / "claimed" / name
+        try:
+            os.rename(queue / "pending" / name, claimed)
+        except FileNotFoundError: # claimed by another worker
+            continue
+
+        harmonised = harmonise_dataset(prefix, pl.read_parquet(claimed))
+        harmonised.write_parquet(queue / "done" / f"{name}.tmp")
+        os.rename(queue / "done" / f"{name}.tmp", queue / "done" / name)
+        claimed.unlink()
+
+def harmonise_sharded(
+    prefix: str,
+    df: pl.DataFrame,
+    n_shards: int = 8,
+    n_workers: int | None = None, # defaults to the number of CPUs
+    queue: Path | None = None, # an empty directory, shared with any external workers; defaults to a temporary directory
+    id_column: str = "ID",
+) -> pl.DataFrame:
+    """
+    Harmonise `df` in shards across worker processes, and merge the shards back in `id_column` order.
+
+    All of the harmonisation rules are row-local, so the result is the same as harmonising `df` in one process.
+    """
+    temporary = queue is None
+    queue = Path(tempfile.mkdtemp(prefix="ipaq-shards-")) if temporary else queue
+    for d in QUEUE_DIRS:
+        (queue / d).mkdir(parents=True, exist_ok=True)
+
+    try:
+        shards = shard_by_id(df, n_shards, id_column)
+        for i, shard in enumerate(shards):
+            shard.write_parquet(queue / "pending" / f"shard-{i:04}.parquet")
+
+        # Polars is multithreaded, so workers are spawned rather than forked
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=work, args=(queue, prefix))
+            for _ in range(min(n_workers or os.cpu_count() or 1, len(shards)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        done = sorted((queue / "done").glob("shard-*.parquet"))
+        if len(done) != len(shards):
+            raise RuntimeError(f"{len(shards) - len(done)} of {len(shards)} shards failed, see the worker output")
+
+        # Rows with the same ID are in the same shard, so a stable sort keeps them in their order in `df`
+        return pl.concat([pl.read_parquet(f) for f in done]).sort(id_column, maintain_order=True)
+    finally:
+        if temporary:
+            shutil.rmtree(queue)
+
+if __name__ == "__main__":
+    # Run a worker against an existing queue, ie. `python shard.py <queue> G220`
+    queue, prefix = sys.argv[1:]
+    work(Path(queue), prefix)
@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+from typing import Any, Self
+
+import numpy as np
+import polars as pl
+
+from rule_tree import input_columns
+
+@dataclass
+class SparseBlock:
+    """
+    A block of columns stored sparsely: a validity bitmap over the frame's rows, the values of only the valid rows,
+    and the value of each column in every other row (`fill`, ie. null), which is the same in all of them.
+
+    Row-wise expressions on the block are evaluated on the valid rows, and once on `fill` for the rest,
+    so their cost scales with the valid rows rather than the frame.
+    """
+    valid: pl.Series # bool, one per row of the frame
+    values: pl.DataFrame # the block's columns, in the valid rows
+    fill: dict[str, Any] # each column's value in the rows which aren't valid
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame, columns: list[str]) -> Self:
+        "The block of `columns` in `df`, whose valid rows are those with any non-null value in them."
+        valid = df.select(pl.any_horizontal(pl.col(columns).is_not_null())).to_series()
+        return cls(valid, df.select(columns).filter(valid), dict.fromkeys(columns))
+
+    @property
+    def density(self) -> float:
+        "The share of rows which are valid."
+        return self.values.height / max(self.valid.len(), 1)
+
+    def with_columns(self, exprs: list[pl.Expr]) -> Self:
+        "`with_columns` of row-wise expressions over the block's columns."
+        fill = pl.DataFrame([self.fill], schema=self.values.schema).with_columns(exprs)
+        return type(self)(self.valid, self.values.with_columns(exprs), fill.row(0, named=True))
+
+    def densify(self, columns: list[str] | None = None) -> list[pl.Series]:
+        "The block's columns (or just `columns`) over every row of the frame."
+        # The row of `values` for each row of the frame, where the rows which aren't valid take a row of `fill` after them
+        rows = np.full(self.valid.len(), self.values.height, dtype=np.uint32)
+        rows[self.valid.to_numpy()] = np.arange(self.values.height, dtype=np.uint32)
+        return [
+            self.values.get_column(column).extend_constant(self.fill[column], 1).gather(rows)
+            for column in columns or self.values.columns
+        ]
+
+def with_columns_sparse(
+    df: pl.DataFrame,
+    stages: list[list[pl.Expr]], # each one `with_columns` of row-wise expressions
+    blocks: list[list[str]], # ie. the columns of each domain, see `harmonise_long.domain_columns`
+    max_density: float,
+) -> pl.DataFrame:
+    """
+    Apply `stages` to `df`, evaluating the expressions which only read one block's columns on a `SparseBlock` of it,
+    if fewer than `max_density` of its rows have any value.
+
+    Once an expression reads across blocks (ie. a total over every domain), the blocks are densified,
+    and the rest of the stages are applied to the whole frame as usual.
+    """
+    columns = list(dict.fromkeys(df.columns + [exp.meta.output_name() for stage in stages for exp in stage]))
+    sparse = [block for block in (SparseBlock.from_frame(df, c) for c in blocks if c) if block.density < max_density]
+    written: list[set[str]] = [set() for _ in sparse]
+
+    def block_of(exp: pl.Expr) -> int | None:
+        "The block which `exp` is local to, -1 if it reads and writes no block's columns, or None if it crosses them."
+        inputs = set(input_columns(exp))
+        touched = [i for i, block in enumerate(sparse) if {*inputs, exp.meta.output_name()} & set(block.values.columns)]
+        if not touched:
+            return -1
+        if len(touched) == 1 and inputs <= set(sparse[touched[0]].values.columns):
+            return touched[0]
+        return None
+
+    for n, stage in enumerate(stages):
+        routes = [block_of(exp) for exp in stage]
+        if None in routes:
+            break
+        for i, block in enumerate(sparse):
+            if local := [exp for exp, route in zip(stage, routes) if route == i]:
+                sparse[i] = block.with_columns(local)
+                written[i] |= {exp.meta.output_name() for exp in local}
+        if dense := [exp for exp, route in zip(stage, routes) if route == -1]:
+            df = df.with_columns(dense)
+    else:
+        n = len(stages)
+
+    df = df.with_columns(series for block, names in zip(sparse, written) for series in block.densify(sorted(names)))
+    for stage in stages[n:]:
+        df = df.with_columns(stage)
+    return df.select(columns)
@@ -0,0 +1,23 @@
+import warnings
+
+import polars as pl
+
+def blocking_operations(lf: pl.LazyFrame) -> list[str]:
+    """
+    The operations in the plan of `lf` which the streaming engine can't run, so would run in memory.
+
+    Polars' streaming explain puts everything it can stream below a `STREAMING:` node,
+    so these are the plan nodes above it, or every node if nothing streams.
+    """
+    plan = lf.explain(streaming=True).splitlines()
+    streaming = next((i for i, line in enumerate(plan) if line.strip() == "STREAMING:"), len(plan))
+    return [line.strip() for line in plan[:streaming] if line.strip()]
+
+def check_streaming(lf: pl.LazyFrame) -> pl.LazyFrame:
+    "Warn about any operations in `lf` which block the streaming engine."
+    if blocking := blocking_operations(lf):
+        warnings.warn(
+            "These operations can't run in the streaming engine, so will be run in memory:\n"
+            + "\n".join(operation[:120] for operation in blocking)
+        )
+    return lf
@@ -1,15 +1,21 @@
-from typing import Callable
+from typing import Any, Callable
 import polars as pl
 import pointblank as pb
-from odyssey.core import Dataset, Metadata, zip_cols_to_metadata, convert_metadata_to_dict, merge_dictionaries
+from odyssey.core import Metadata, zip_cols_to_metadata, convert_metadata_to_dict, merge_dictionaries
 from pathlib import Path
 
+from sav import load_data
+
 type MetadataType = dict[str, str|int|dict[int|float, str]]
 type MetadataDict = dict[str, MetadataType]
 
-def read_data(file: str, directory: Path) -> tuple[pl.DataFrame, MetadataDict]:
-    data = Dataset(file, directory)
-    lf, meta = data.load_data()
+def read_data(
+    file: str,
+    directory: Path,
+    direct: bool = False, # decode without the pandas intermediate, across processes for large files; see `sav.load_data`
+    n_workers: int | None = None,
+) -> tuple[pl.DataFrame, MetadataDict]:
+    lf, meta = load_data(file, directory, n_workers, direct)
     df = lf.collect()
     return df, meta
 
@@ -24,6 +30,82 @@ def update_metadata(
     harmonised_meta = merge_dictionaries([converted_meta, existing_metadata])
     return harmonised_meta
 
+def fill_nulls(
+    column: str,
+    value: int|float
+    ) -> Callable:
+    """Returns a preprocessing function to fill null values in a single column."""
+    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
+        return df.with_columns(pl.col(column).fill_null(value))
+    preprocessor.columns = [column]
+    return preprocessor
+
+def _resolve_columns(
+    selection: Any,
+    columns: list[str]
+    ) -> list[str]:
+    "Resolve the column names referenced by a step's `column`, `values` or `segments`."
+    if isinstance(selection, str):
+        return [selection]
+    if isinstance(selection, (list, tuple)):
+        return [col for item in selection for col in _resolve_columns(item, columns)]
+    if isinstance(selection, pl.Expr):
+        return selection.meta.root_names()
+    if isinstance(getattr(selection, "exprs", None), str): # ie. `pb.col("check")`
+        return [selection.exprs]
+    if hasattr(selection, "resolve"): # column selectors, ie. `pb.starts_with(...)`
+        return selection.resolve(columns=columns)
+    return []
+
+def project_steps(
+    validation: pb.Validate,
+    id_column: str = "ID" # kept in every step, if in the data, so the failing rows' extracts identify participants
+    ) -> pb.Validate:
+    """
+    Narrow the frame passed to each validation step down to the columns the step reads, and `id_column`.
+
+    A step's footprint is its target column(s), any columns referenced by its `values`
+    (ie. a `col_vals_expr` expression) or `segments`, and the input columns of its `pre` function,
+    which the `check_*` factories record as `preprocessor.columns`.
+    Selecting existing columns in Polars is zero-copy, so memory scales with the step's inputs rather than the file width.
+
+    Steps with a `pre` function of unknown footprint (ie. an inline lambda) are left as-is.
+    Must be called before `interrogate()`.
+    """
+    columns = validation.data.columns
+
+    for step in validation.validation_info:
+        if step.pre is not None and not hasattr(step.pre, "columns"):
+            continue
+
+        referenced = [id_column] + _resolve_columns([step.column, step.values, step.segments], columns)
+        referenced += getattr(step.pre, "columns", [])
+        footprint = [col for col in dict.fromkeys(referenced) if col in columns]
+
+        step.pre = _project(footprint, step.pre)
+
+    return validation
+
+def _project(
+    footprint: list[str],
+    pre: Callable | None
+    ) -> Callable:
+    "Returns a preprocessing function which selects `footprint` before applying `pre`."
+    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
+        projected_df = df.select(footprint)
+        return projected_df if pre is None else pre(projected_df)
+    return preprocessor
+
+def expected_total_mins(
+    hpd_column: str,
+    mpd_column: str
+    ) -> pl.Expr:
+    "Expected total minutes per day for a category, capped at 180 minutes."
+    return (
+        (pl.col(hpd_column).fill_null(0) * 60 + pl.col(mpd_column).fill_null(0))
+        .pipe(lambda expr: pl.when(expr > 180).then(180).otherwise(expr))
+    )
+
 def check_total_mins(
     hpd_column: str,
     mpd_column: str
@@ -33,13 +115,18 @@ def check_total_mins(
     Cap the total at 180 minutes, and preserve null values.
     """
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        return df.with_columns(
-            (pl.col(hpd_column).fill_null(0) * 60 + pl.col(mpd_column).fill_null(0))
-            .pipe(lambda expr: pl.when(expr > 180).then(180).otherwise(expr))
-            .alias("check")
-        )
+        return df.with_columns(expected_total_mins(hpd_column, mpd_column).alias("check"))
+    preprocessor.columns = [hpd_column, mpd_column]
     return preprocessor
 
+def expected_met(
+    mins_column: str,
+    n_days_column: str,
+    factor: int|float
+    ) -> pl.Expr:
+    "Expected MET minutes per week for a category."
+    return pl.col(mins_column).fill_null(0) * pl.col(n_days_column).fill_null(0) * factor
+
 def check_met(
     mins_column: str, 
     n_days_column: str, 
@@ -49,11 +136,24 @@ def check_met(
     """Returns a preprocessing function to verify the calculated MET value for a given category."""
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
         return df.with_columns(
-            (pl.col(mins_column).fill_null(0) * pl.col(n_days_column).fill_null(0) * factor).alias("check"),
+            expected_met(mins_column, n_days_column, factor).alias("check"),
             pl.col(met_column).fill_null(0)
         )
+    preprocessor.columns = [mins_column, n_days_column, met_column]
     return preprocessor
 
+def expected_tot_met(
+    vig_met: str,
+    mod_met: str,
+    walk_met: str
+    ) -> pl.Expr:
+    "Expected total MET; None if any of the category MET values are None."
+    return (
+        pl.when(pl.col(vig_met).is_null() | pl.col(mod_met).is_null() | pl.col(walk_met).is_null())
+        .then(None)
+        .otherwise(sum([pl.col(vig_met), pl.col(mod_met), pl.col(walk_met)]))
+    )
+
 def check_tot_met(
     vig_met: str,
     mod_met: str,
@@ -62,18 +162,41 @@ def check_tot_met(
     ) -> Callable:
     """Returns a preprocessing function to verify the calculated total MET value."""
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        expr = (
-            pl.when(pl.col(vig_met).is_null() | pl.col(mod_met).is_null() | pl.col(walk_met).is_null())
-            .then(None)
-            .otherwise(sum([pl.col(vig_met), pl.col(mod_met), pl.col(walk_met)]))
-        )
-        
         return df.with_columns(
-            expr.alias("check"),
+            expected_tot_met(vig_met, mod_met, walk_met).alias("check"),
             pl.col(tot_met)
         )
+    preprocessor.columns = [vig_met, mod_met, walk_met, tot_met]
     return preprocessor
 
+def expected_ipaq_cat(
+    vig_days: str,
+    mod_days: str,
+    walk_days: str,
+    vig_mins: str,
+    mod_mins: str,
+    walk_mins: str,
+    tot_met: str
+    ) -> pl.Expr:
+    "Expected IPAQ category; see `check_ipaq_cat` for the criteria."
+    return (
+        pl.when(pl.col(tot_met).is_null()).then(None)
+        .when(
+            (pl.col(vig_days).ge(3) & pl.col(vig_mins).ge(10) & pl.col(tot_met).ge(1500)) | 
+            (sum(pl.col(col).fill_null(0) for col in [vig_days, mod_days, walk_days]).ge(7) & pl.col(tot_met).ge(3000))
+        ).then(2)
+        .when(
+            (pl.col(vig_days).ge(3) & pl.col(vig_mins).ge(20)) |
+            (sum(pl.col(col).fill_null(0) for col in [vig_days, mod_days, walk_days]).ge(5) & pl.col(tot_met).ge(600)) |
+            ((pl.col(mod_days).ge(5) & pl.col(mod_mins).ge(30)) |
+                (pl.col(walk_days).ge(5) & pl.col(walk_mins).ge(30)) |
+                (sum(pl.col(col).fill_null(0) for col in [mod_days, walk_days]).ge(5) &
+                    pl.col(mod_mins).ge(30) & pl.col(walk_mins).ge(30)))
+        ).then(1)
+        .when(pl.col(tot_met).is_null()).then(None)
+        .otherwise(0)
+    )
+
 def check_ipaq_cat(
     vig_days: str, # days of vigorous exercise per week
     mod_days: str,
@@ -106,24 +229,10 @@ def check_ipaq_cat(
     """
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
         return df.with_columns(
-            (pl.when(pl.col(tot_met).is_null()).then(None)
-            .when(
-                (pl.col(vig_days).ge(3) & pl.col(vig_mins).ge(10) & pl.col(tot_met).ge(1500)) | 
-                (sum(pl.col(col).fill_null(0) for col in [vig_days, mod_days, walk_days]).ge(7) & pl.col(tot_met).ge(3000))
-            ).then(2)
-            .when(
-                (pl.col(vig_days).ge(3) & pl.col(vig_mins).ge(20)) |
-                (sum(pl.col(col).fill_null(0) for col in [vig_days, mod_days, walk_days]).ge(5) & pl.col(tot_met).ge(600)) |
-                ((pl.col(mod_days).ge(5) & pl.col(mod_mins).ge(30)) |
-                    (pl.col(walk_days).ge(5) & pl.col(walk_mins).ge(30)) |
-                    (sum(pl.col(col).fill_null(0) for col in [mod_days, walk_days]).ge(5) &
-                        pl.col(mod_mins).ge(30) & pl.col(walk_mins).ge(30)))
-            ).then(1)
-            .when(pl.col(tot_met).is_null()).then(None)
-            .otherwise(0)
-            ).alias("check"),
+            expected_ipaq_cat(vig_days, mod_days, walk_days, vig_mins, mod_mins, walk_mins, tot_met).alias("check"),
             pl.col(cat).fill_null(0) # Fill nulls with 0; otherwise the validation skips if one value in a comparison is null
         )
+    preprocessor.columns = [vig_days, mod_days, walk_days, vig_mins, mod_mins, walk_mins, tot_met, cat]
     return preprocessor
 
 # TODO: simplify/DRY - use partial functions or other method to reduce the duplication
@@ -197,7 +306,7 @@ def validate_ipaq(
         .col_vals_expr(
             expr=pl.col(f"{prefix}_IPAQ_VIG_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col(f"{prefix}_IPAQ_VIG_HPD").fill_null(0))
+            pre=fill_nulls(f"{prefix}_IPAQ_VIG_HPD", 0)
         )
         .col_vals_between(
             columns=f"{prefix}_IPAQ_VIG_MPD", 
@@ -224,7 +333,7 @@ def validate_ipaq(
         )
         .col_vals_null(
             columns=[f"{prefix}_IPAQ_VIG_D", f"{prefix}_IPAQ_VIG_HPD", f"{prefix}_IPAQ_VIG_MPD", f"{prefix}_IPAQ_VIG_MINS", f"{prefix}_IPAQ_VIG_MET"],
-            pre=lambda df: df.with_columns(pl.col(f"{prefix}_IPAQ_VIG_W").fill_null(-1)), # Pointblank doesn't seem to like segmenting values with null, so transform null to -1 and segment y that
+            pre=fill_nulls(f"{prefix}_IPAQ_VIG_W", -1), # Pointblank doesn't seem to like segmenting values with null, so transform null to -1 and segment y that
             segments=(f"{prefix}_IPAQ_VIG_W", -1)
         )
         .col_vals_between(
@@ -244,7 +353,7 @@ def validate_ipaq(
         .col_vals_expr(
             expr=pl.col(f"{prefix}_IPAQ_MOD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col(f"{prefix}_IPAQ_MOD_HPD").fill_null(0))
+            pre=fill_nulls(f"{prefix}_IPAQ_MOD_HPD", 0)
         )
         .col_vals_between(
             columns=f"{prefix}_IPAQ_MOD_MPD", 
@@ -271,7 +380,7 @@ def validate_ipaq(
         )
         .col_vals_null(
             columns=[f"{prefix}_IPAQ_MOD_D", f"{prefix}_IPAQ_MOD_HPD", f"{prefix}_IPAQ_MOD_MPD", f"{prefix}_IPAQ_MOD_MINS", f"{prefix}_IPAQ_MOD_MET"],
-            pre=lambda df: df.with_columns(pl.col(f"{prefix}_IPAQ_MOD_W").fill_null(-1)), # Pointblank doesn't seem to like segmenting values with null, so transform null to -1 and segment y that
+            pre=fill_nulls(f"{prefix}_IPAQ_MOD_W", -1), # Pointblank doesn't seem to like segmenting values with null, so transform null to -1 and segment y that
             segments=(f"{prefix}_IPAQ_MOD_W", -1)
         )
         .col_vals_between(
@@ -291,7 +400,7 @@ def validate_ipaq(
         .col_vals_expr(
             expr=pl.col(f"{prefix}_IPAQ_WALK_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col(f"{prefix}_IPAQ_WALK_HPD").fill_null(0))
+            pre=fill_nulls(f"{prefix}_IPAQ_WALK_HPD", 0)
         )
         .col_vals_between(
             columns=f"{prefix}_IPAQ_WALK_MPD", 
@@ -318,7 +427,7 @@ def validate_ipaq(
         )
         .col_vals_null(
             columns=[f"{prefix}_IPAQ_WALK_D", f"{prefix}_IPAQ_WALK_HPD", f"{prefix}_IPAQ_WALK_MPD", f"{prefix}_IPAQ_WALK_MINS", f"{prefix}_IPAQ_WALK_MET"],
-            pre=lambda df: df.with_columns(pl.col(f"{prefix}_IPAQ_WALK_W").fill_null(-1)), # Pointblank doesn't seem to like segmenting values with null, so transform null to -1 and segment y that
+            pre=fill_nulls(f"{prefix}_IPAQ_WALK_W", -1), # Pointblank doesn't seem to like segmenting values with null, so transform null to -1 and segment y that
             segments=(f"{prefix}_IPAQ_WALK_W", -1)
         )
         .col_vals_eq(
@@ -332,11 +441,22 @@ def validate_ipaq(
             na_pass=True,
             brief="Check `IPAQ_CAT` is correctly calculated."
         )
-    ).interrogate()
+    )
 
-    return validation
+    return project_steps(validation).interrogate()
 
 
+def expected_sit_trunc(
+    hpd: str,
+    mpd: str
+    ) -> pl.Expr:
+    "Expected total SIT time, capped at 960 minutes; None if both HPD and MPD are None."
+    return (
+        pl.when(pl.col(hpd).is_null() & pl.col(mpd).is_null())
+        .then(None)
+        .otherwise(pl.min_horizontal(960, pl.col(hpd).fill_null(0) * 60 + pl.col(mpd).fill_null(0)))
+    )
+
 def check_sit_trunc(
     hpd: str,
     mpd: str,
@@ -349,16 +469,11 @@ def check_sit_trunc(
     If both HPD and MPD are Null, SIT_TRUNC should be Null.
     """
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        expr = (
-            pl.when(pl.col(hpd).is_null() & pl.col(mpd).is_null())
-            .then(None)
-            .otherwise(pl.min_horizontal(960, pl.col(hpd).fill_null(0) * 60 + pl.col(mpd).fill_null(0)))
-        )
-        
         return df.with_columns(
-            expr.alias("check"),
+            expected_sit_trunc(hpd, mpd).alias("check"),
             # pl.col(sit_trunc).fill_null(0) # Fill nulls with 0; otherwise the validation skips if one value in a comparison is null
         )
+    preprocessor.columns = [hpd, mpd]
     return preprocessor
 
 def validate_sitting(
@@ -394,4 +509,4 @@ def validate_sitting(
             )
         )
 
-    return validation.interrogate()
\ No newline at end of file
+    return project_steps(validation).interrogate()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import polars as pl
+
+from validate_lazy import Rules, short_form_rules, sitting_rules, long_form_rules
+import validate_long
+from row_hash import HASH, with_row_hash
+from rule_tree import input_columns
+from validation_cache import definition_key
+
+def _evaluate(lf: pl.LazyFrame, rules: Rules, columns: list[str], id_column: str) -> pl.DataFrame:
+    "One row per ID, with the row hash and each rule's result (True, False, or Null when not tested)."
+    return (
+        with_row_hash(lf, columns)
+        .select(pl.col(id_column), pl.col(HASH), *[rule.alias(name) for name, rule in rules.items()])
+        .collect(streaming=True)
+    )
+
+def summarise_results(
+    results: pl.DataFrame, # from `validate_incremental`
+    rules: list[str],
+    n_failing: int = 10,
+    id_column: str = "ID",
+) -> pl.DataFrame:
+    "Summarise per-row results in the same format as `validate_lazy.validate_lazy`."
+    return pl.concat([
+        results.select(
+            pl.lit(name).alias("rule"),
+            pl.col(name).is_not_null().sum().cast(pl.Int64).alias("n"),
+            pl.col(name).sum().cast(pl.Int64).alias("n_passed"),
+            pl.col(name).not_().sum().cast(pl.Int64).alias("n_failed"),
+            pl.col(id_column).filter(pl.col(name).not_()).head(n_failing).implode().alias("failing_ids"),
+        )
+        for name in rules
+    ])
+
+def result_column(name: str, rule: pl.Expr) -> str:
+    """
+    The column of a rule's results in the per-row results, ie. `VIG_D in range#3f9a...`:
+    its name and `validation_cache.definition_key`, so results are only reused while the rule is unchanged.
+    """
+    return f"{name}#{definition_key(name, rule)[:16]}"
+
+def validate_incremental(
+    lf: pl.LazyFrame | pl.DataFrame,
+    rules: Rules,
+    previous: pl.DataFrame | None = None, # the per-row results of the last run
+    n_failing: int = 10,
+    id_column: str = "ID",
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Validate only the rows which are new or whose values in the rule columns have changed since `previous`,
+    reusing the previous results for the rest.
+
+    Each rule's results are kept under `result_column`, so a rule which is new or whose definition has changed
+    (ie. a new threshold under the same name) is re-evaluated on every row.
+
+    Returns the summary (as `validate_lazy.validate_lazy`) and the per-row results, which should be saved
+    and passed back as `previous` on the next run. Rows removed since the last run are dropped.
+    """
+    lf = lf.lazy()
+    columns = sorted({column for rule in rules.values() for column in input_columns(rule)})
+    keyed = {result_column(name, rule): rule for name, rule in rules.items()}
+    names = dict(zip(keyed, rules))
+
+    if previous is None or previous.columns[:2] != [id_column, HASH]:
+        results = _evaluate(lf, keyed, columns, id_column)
+        return summarise_results(results.rename(names), list(rules), n_failing, id_column), results
+
+    reused = {column: rule for column, rule in keyed.items() if column in previous.columns}
+    redefined = {column: rule for column, rule in keyed.items() if column not in reused}
+
+    hashes = with_row_hash(lf, columns).select(id_column, HASH).collect(streaming=True)
+    unchanged = previous.select(id_column, HASH, *reused).join(hashes, on=[id_column, HASH], how="semi")
+    changed = hashes.join(unchanged, on=id_column, how="anti").select(id_column)
+
+    fresh = _evaluate(lf.join(changed.lazy(), on=id_column, how="semi"), reused, columns, id_column)
+    results = hashes.select(id_column).join(pl.concat([unchanged, fresh], how="vertical_relaxed"), on=id_column, how="left")
+    if redefined:
+        every_row = lf.select(pl.col(id_column), *[rule.alias(column) for column, rule in redefined.items()])
+        results = results.join(every_row.collect(streaming=True), on=id_column, how="left")
+    results = results.select(id_column, HASH, *keyed)
+
+    return summarise_results(results.rename(names), list(rules), n_failing, id_column), results
+
+def validate_ipaq_incremental(
+    prefix: str,
+    df: pl.LazyFrame | pl.DataFrame,
+    previous: pl.DataFrame | None = None,
+    n_failing: int = 10,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Incremental equivalent of `utils.validate_ipaq` and `utils.validate_sitting` for the short-form datasets.
+    """
+    lf = df.lazy()
+    columns = lf.collect_schema().names()
+    rules = short_form_rules(prefix) | sitting_rules(
+        prefix,
+        sit_weekday=f"{prefix}_IPAQ_SIT_WD_TRUNC" in columns,
+        sit_weekend=f"{prefix}_IPAQ_SIT_WE_TRUNC" in columns,
+    )
+    return validate_incremental(lf, rules, previous, n_failing)
+
+def validate_long_incremental(
+    df: pl.LazyFrame | pl.DataFrame,
+    previous: pl.DataFrame | None = None,
+    n_failing: int = 10,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Incremental equivalent of `validate_long.validate_all_long` for G217.
+    """
+    lf = df.lazy()
+    rules = long_form_rules(lf.collect_schema().names())
+    return validate_incremental(lf.with_columns(validate_long.derive_category_columns("G217")), rules, previous, n_failing)
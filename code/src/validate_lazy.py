@@ -0,0 +1,282 @@
+import polars as pl
+
+from harmonise import categories_with_factors as short_categories_with_factors
+from harmonise_long import met_categories
+from utils import expected_total_mins, expected_met, expected_tot_met, expected_ipaq_cat, expected_sit_trunc
+import validate_long
+
+type Rules = dict[str, pl.Expr]
+type Segment = tuple[str, int|None] # (column, value); a value of None segments on null
+
+# Long-form domains: the categories in each, and the total MET they sum to
+long_domains = {
+    "jobs": (["JOB_VIG", "JOB_MOD", "JOB_WALK"], "TOT_WORK_MET"),
+    "transport": (["TRANS_MV", "TRANS_BIKE", "TRANS_WALK"], "TOT_TRANS_MET"),
+    "home": (["HOME_OUT_VIG", "HOME_OUT_MOD", "HOME_IN_MOD"], "TOT_HOME_MET"),
+    "leisure": (["LSR_VIG", "LSR_MOD", "LSR_WALK"], "TOT_LSR_MET"),
+}
+
+def add_rule(
+    rules: Rules,
+    assertion: str, # the equivalent pointblank assertion, ie. `col_vals_between`
+    column: str,
+    check: pl.Expr, # True where the row passes
+    segments: Segment | None = None,
+    na_pass: bool = False,
+) -> None:
+    """
+    Add a rule to `rules`, as a boolean expression which is True (pass), False (fail), or Null (not applicable).
+
+    Mirrors pointblank: rows outside of `segments` are not tested (Null),
+    and a Null result within the segment passes only if `na_pass` is True.
+    """
+    name = f"{assertion}({column})"
+    check = check.fill_null(na_pass)
+
+    if segments is not None:
+        segment_column, value = segments
+        name += f" [{segment_column}={value}]"
+        in_segment = pl.col(segment_column).is_null() if value is None else pl.col(segment_column).eq(value)
+        check = pl.when(in_segment).then(check)
+
+    if name in rules:
+        raise ValueError(f"Duplicate rule: {name}")
+    rules[name] = check
+
+def _add_hpd_and_mpd_rules(
+    rules: Rules,
+    hpd: str,
+    mpd: str,
+    max_hours: int,
+    segments: Segment | None = None,
+    exclude_low_mpd: bool = False, # long form: MPD between 1 and 9 is invalid
+) -> None:
+    "Add the range checks for HPD and MPD shared by all categories."
+    add_rule(rules, "col_vals_between", hpd, pl.col(hpd).is_between(0, max_hours), segments, na_pass=True)
+    add_rule(rules, "col_vals_expr", hpd, pl.col(hpd).fill_null(0) % 1 == 0) # HPD is a whole number
+    add_rule(rules, "col_vals_between", mpd, pl.col(mpd).is_between(0, 59), segments, na_pass=True)
+    if exclude_low_mpd:
+        add_rule(rules, "col_vals_outside", mpd, ~pl.col(mpd).is_between(1, 9), segments, na_pass=True)
+
+def short_form_rules(prefix: str) -> Rules:
+    """
+    Rules equivalent to `utils.validate_ipaq`, as expressions which can be evaluated on a LazyFrame.
+    """
+    rules = {}
+
+    for cat in short_categories_with_factors:
+        add_rule(
+            rules, "col_vals_eq", f"{prefix}_IPAQ_{cat}_MINS",
+            pl.col(f"{prefix}_IPAQ_{cat}_MINS") == expected_total_mins(f"{prefix}_IPAQ_{cat}_HPD", f"{prefix}_IPAQ_{cat}_MPD"),
+            na_pass=True
+        )
+
+    for cat, f in short_categories_with_factors.items():
+        add_rule(
+            rules, "col_vals_eq", f"{prefix}_IPAQ_{cat}_MET",
+            pl.col(f"{prefix}_IPAQ_{cat}_MET").fill_null(0) == expected_met(f"{prefix}_IPAQ_{cat}_MINS", f"{prefix}_IPAQ_{cat}_D", f)
+        )
+
+    add_rule(
+        rules, "col_vals_eq", f"{prefix}_IPAQ_TOT_MET",
+        pl.col(f"{prefix}_IPAQ_TOT_MET") == expected_tot_met(f"{prefix}_IPAQ_VIG_MET", f"{prefix}_IPAQ_MOD_MET", f"{prefix}_IPAQ_WALK_MET"),
+        na_pass=True
+    )
+
+    for cat in short_categories_with_factors:
+        weekly_activity = f"{prefix}_IPAQ_{cat}_W"
+        days, hpd, mpd, mins, met = (f"{prefix}_IPAQ_{cat}_{col}" for col in ["D", "HPD", "MPD", "MINS", "MET"])
+
+        add_rule(rules, "col_vals_between", days, pl.col(days).is_between(1, 7), (weekly_activity, 1), na_pass=True)
+        _add_hpd_and_mpd_rules(rules, hpd, mpd, max_hours=18, segments=(weekly_activity, 1))
+        add_rule(rules, "col_vals_between", mins, pl.col(mins).is_between(0, 180), (weekly_activity, 1), na_pass=True)
+
+        for col in [days, hpd, mpd]:
+            add_rule(rules, "col_vals_null", col, pl.col(col).is_null(), (weekly_activity, 0))
+        for col in [mins, met]:
+            add_rule(rules, "col_vals_eq", col, pl.col(col) == 0, (weekly_activity, 0))
+        for col in [days, hpd, mpd, mins, met]:
+            add_rule(rules, "col_vals_null", col, pl.col(col).is_null(), (weekly_activity, None))
+
+    add_rule(
+        rules, "col_vals_eq", f"{prefix}_IPAQ_CAT",
+        pl.col(f"{prefix}_IPAQ_CAT").fill_null(0) == expected_ipaq_cat(
+            *(f"{prefix}_IPAQ_{cat}_D" for cat in short_categories_with_factors),
+            *(f"{prefix}_IPAQ_{cat}_MINS" for cat in short_categories_with_factors),
+            f"{prefix}_IPAQ_TOT_MET"
+        ),
+        na_pass=True
+    )
+
+    return rules
+
+def sitting_rules(
+    prefix: str,
+    sit_weekday: bool = True,
+    sit_weekend: bool = True,
+) -> Rules:
+    """
+    Rules equivalent to `utils.validate_sitting`.
+    """
+    rules = {}
+
+    for time_of_week, include in [("WD", sit_weekday), ("WE", sit_weekend)]:
+        if include:
+            trunc = f"{prefix}_IPAQ_SIT_{time_of_week}_TRUNC"
+            expected = expected_sit_trunc(f"{prefix}_IPAQ_SIT_{time_of_week}_HPD", f"{prefix}_IPAQ_SIT_{time_of_week}_MPD")
+            add_rule(rules, "col_vals_eq", trunc, pl.col(trunc) == expected, na_pass=True)
+
+    return rules
+
+def long_form_rules(
+    columns: list[str], # the columns of the dataset, used to resolve the `starts_with` checks
+    prefix: str = "G217",
+) -> Rules:
+    """
+    Rules equivalent to all of the `validate_long` validators.
+
+    The summed MET checks read the derived columns from `validate_long.derive_category_columns`,
+    which must be added to the frame first (`validate_long_lazy` does this).
+    """
+    rules = {}
+
+    def starts_with(text: str) -> list[str]:
+        return [col for col in columns if col.startswith(text)]
+
+    job = f"{prefix}_IPAQ_JOB"
+    add_rule(rules, "col_vals_in_set", job, pl.col(job).is_in([0, 1]) | pl.col(job).is_null())
+    for col in starts_with(f"{job}_"):
+        add_rule(rules, "col_vals_null", col, pl.col(col).is_null(), (job, 0))
+
+    for cats, total in long_domains.values():
+        for cat in cats:
+            for col in starts_with(f"{prefix}_IPAQ_{cat}_"):
+                add_rule(rules, "col_vals_eq", col, pl.col(col) == 0, (f"{prefix}_IPAQ_{cat}", 0))
+
+        for cat in cats:
+            days = f"{prefix}_IPAQ_{cat}_D"
+            add_rule(rules, "col_vals_between", days, pl.col(days).is_between(1, 7), (f"{prefix}_IPAQ_{cat}", 1), na_pass=True)
+
+        for cat in cats:
+            _add_hpd_and_mpd_rules(
+                rules, f"{prefix}_IPAQ_{cat}_HPD", f"{prefix}_IPAQ_{cat}_MPD",
+                max_hours=16, segments=(f"{prefix}_IPAQ_{cat}", 1), exclude_low_mpd=True
+            )
+
+        add_rule(
+            rules, "col_vals_eq", f"{prefix}_IPAQ_{total}",
+            pl.col(f"{prefix}_IPAQ_{total}") == validate_long.expected_summed_met(met_categories[total]),
+            na_pass=True
+        )
+
+    for met, round_categories in [("WALK_MET", True), ("MOD_MET", False), ("VIG_MET", False)]:
+        add_rule(
+            rules, "col_vals_eq", f"{prefix}_IPAQ_{met}",
+            pl.col(f"{prefix}_IPAQ_{met}") == validate_long.expected_summed_met(met_categories[met], round_categories),
+            na_pass=True
+        )
+
+    add_rule(
+        rules, "col_vals_eq", f"{prefix}_IPAQ_TOT_MET",
+        pl.col(f"{prefix}_IPAQ_TOT_MET") == validate_long.expected_tot_met(f"{prefix}_IPAQ_VIG_MET", f"{prefix}_IPAQ_MOD_MET", f"{prefix}_IPAQ_WALK_MET"),
+        na_pass=True
+    )
+    add_rule(
+        rules, "col_vals_eq", f"{prefix}_IPAQ_CAT",
+        pl.col(f"{prefix}_IPAQ_CAT").fill_null(0) == validate_long.expected_ipaq_cat(
+            *(f"{prefix}_IPAQ_{cat}_D" for cat in [
+                "JOB_VIG", "JOB_MOD", "JOB_WALK", "TRANS_BIKE", "TRANS_WALK",
+                "HOME_OUT_VIG", "HOME_OUT_MOD", "HOME_IN_MOD", "LSR_VIG", "LSR_MOD", "LSR_WALK"
+            ]),
+            f"{prefix}_IPAQ_JOB_VIG_HPD", f"{prefix}_IPAQ_JOB_VIG_MPD",
+            f"{prefix}_IPAQ_LSR_VIG_HPD", f"{prefix}_IPAQ_LSR_VIG_MPD",
+            f"{prefix}_IPAQ_TOT_MET"
+        ),
+        na_pass=True
+    )
+
+    rules.update(sitting_rules(prefix))
+    for activity, max_hours in [("STAND", 16), ("LYING", 24)]:
+        for time_of_week in ["WD", "WE"]:
+            _add_hpd_and_mpd_rules(
+                rules, f"{prefix}_IPAQ_{activity}_{time_of_week}_HPD", f"{prefix}_IPAQ_{activity}_{time_of_week}_MPD",
+                max_hours=max_hours
+            )
+
+    return rules
+
+def validate_lazy(
+    lf: pl.LazyFrame | pl.DataFrame,
+    rules: Rules,
+    n_failing: int = 10, # number of failing IDs to keep per rule
+    id_column: str = "ID",
+) -> pl.DataFrame:
+    """
+    Evaluate every rule as a streaming aggregation, returning one row per rule with
+    the number of rows tested, passed and failed, and the first `n_failing` failing IDs.
+
+    Only the columns referenced by the rules are read, and the counts and failing IDs are
+    both computed with the streaming engine, so files larger than memory can be validated.
+    """
+    checked = lf.lazy().select(pl.col(id_column), *[rule.alias(name) for name, rule in rules.items()])
+
+    counts = checked.group_by(pl.lit(0)).agg(
+        *[pl.col(name).is_not_null().sum().alias(f"n_{i}") for i, name in enumerate(rules)],
+        *[pl.col(name).sum().alias(f"n_passed_{i}") for i, name in enumerate(rules)],
+    )
+    # Every rule's results as one column, so the data is scanned once for all of them
+    failing = (
+        checked.with_row_index("row")
+        .unpivot(index=["row", id_column], variable_name="rule", value_name="passed")
+        .filter(pl.col("passed").not_())
+        .group_by("rule")
+        .agg(pl.struct("row", id_column).bottom_k_by("row", n_failing).alias("failing"))
+    )
+
+    # Don't share the `checked` subplan between queries; caching it would materialise every rule
+    counts, failing = pl.collect_all([counts, failing], streaming=True, comm_subplan_elim=False)
+    # `bottom_k` isn't in row order, so order the (at most `n_failing`) IDs of each rule by row
+    failing = failing.explode("failing").unnest("failing").sort("row")
+    failing_ids = dict(failing.group_by("rule", maintain_order=True).agg(pl.col(id_column)).iter_rows())
+
+    return pl.DataFrame(
+        [
+            {
+                "rule": name,
+                "n": counts[f"n_{i}"].item(),
+                "n_passed": counts[f"n_passed_{i}"].item(),
+                "n_failed": counts[f"n_{i}"].item() - counts[f"n_passed_{i}"].item(),
+                "failing_ids": failing_ids.get(name, []),
+            }
+            for i, name in enumerate(rules)
+        ],
+        schema_overrides={"failing_ids": pl.List(checked.collect_schema()[id_column])},
+    )
+
+def validate_ipaq_lazy(
+    prefix: str,
+    lf: pl.LazyFrame | pl.DataFrame,
+    n_failing: int = 10,
+) -> pl.DataFrame:
+    """
+    Streaming equivalent of `utils.validate_ipaq` and `utils.validate_sitting` for the short-form datasets.
+    """
+    lf = lf.lazy()
+    columns = lf.collect_schema().names()
+    rules = short_form_rules(prefix) | sitting_rules(
+        prefix,
+        sit_weekday=f"{prefix}_IPAQ_SIT_WD_TRUNC" in columns,
+        sit_weekend=f"{prefix}_IPAQ_SIT_WE_TRUNC" in columns,
+    )
+    return validate_lazy(lf, rules, n_failing)
+
+def validate_long_lazy(
+    lf: pl.LazyFrame | pl.DataFrame,
+    n_failing: int = 10,
+) -> pl.DataFrame:
+    """
+    Streaming equivalent of `validate_long.validate_all_long` for G217.
+    """
+    lf = lf.lazy()
+    rules = long_form_rules(lf.collect_schema().names())
+    return validate_lazy(lf.with_columns(validate_long.derive_category_columns("G217")), rules, n_failing)
@@ -1,16 +1,71 @@
 from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+import weakref
 import polars as pl
 import pointblank as pb
 from odyssey.core import Dataset
 from pathlib import Path
 
+from harmonise_long import categories_with_factors, met_categories
+from utils import expected_sit_trunc, fill_nulls, project_steps
+
 type Metadata = dict[str, str|int|dict[int|float, str]]
 type MetadataDict = dict[str, Metadata]
 
+# Derived frames keyed by `id()` of the source frame; entries are evicted when the source is garbage collected
+_derived_cache: dict[int, tuple[weakref.ref, pl.DataFrame]] = {}
+
+def derived_column(cat: str, col: str) -> str:
+    """
+    Name of the derived check column for a category, ie. `DERIVED_JOB_VIG_MET`.
+    Deliberately not prefixed with `G217_IPAQ_`, so `pb.starts_with` selectors don't pick them up.
+    """
+    return f"DERIVED_{cat}_{col}"
+
+def derive_category_columns(prefix: str) -> list[pl.expr]:
+    """
+    Calculate the MINS and MET for each category from the raw `D`, `HPD` and `MPD` columns.
+
+    MINS = min(180, HPD * 60 + MPD)
+    MET = factor * D * MINS
+    Nulls are treated as 0, in line with the totals checks.
+    """
+    expressions = []
+
+    for cat, f in categories_with_factors.items():
+        days = f"{prefix}_IPAQ_{cat}_D"
+        hpd = f"{prefix}_IPAQ_{cat}_HPD"
+        mpd = f"{prefix}_IPAQ_{cat}_MPD"
+
+        mins = pl.min_horizontal(180, pl.col(hpd).fill_null(0) * 60 + pl.col(mpd).fill_null(0))
+        expressions.extend([
+            mins.alias(derived_column(cat, "MINS")),
+            (f * pl.col(days).fill_null(0) * mins).alias(derived_column(cat, "MET")),
+        ])
+
+    return expressions
+
+def with_derived_columns(df: pl.DataFrame, prefix: str = "G217") -> pl.DataFrame:
+    """
+    Return `df` with the derived MINS and MET columns for each category, computing them only once per frame.
+
+    Every `validate_*` function reads from this cache, so running all of them on the same frame
+    builds the per-category MET once rather than once per check.
+    A new (or modified, since Polars returns a new frame) `df` gets a fresh entry.
+    """
+    key = id(df)
+    cached = _derived_cache.get(key)
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+
+    derived_df = df.with_columns(derive_category_columns(prefix))
+    _derived_cache[key] = (weakref.ref(df, lambda _: _derived_cache.pop(key, None)), derived_df)
+    return derived_df
+
 def validate_jobs(df: pl.DataFrame) -> pb.Validate:
 
     validation = (
-        pb.Validate(data=df)
+        pb.Validate(data=with_derived_columns(df))
         .col_vals_in_set(
             columns="G217_IPAQ_JOB",
             set=[0, 1, None],
@@ -65,7 +120,7 @@ def validate_jobs(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_JOB_VIG_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_JOB_VIG_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_JOB_VIG_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_JOB_VIG_MPD", 
@@ -91,7 +146,7 @@ def validate_jobs(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_JOB_MOD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_JOB_MOD_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_JOB_MOD_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_JOB_MOD_MPD", 
@@ -117,7 +172,7 @@ def validate_jobs(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_JOB_WALK_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_JOB_WALK_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_JOB_WALK_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_JOB_WALK_MPD", 
@@ -136,45 +191,18 @@ def validate_jobs(df: pl.DataFrame) -> pb.Validate:
         .col_vals_eq(
             columns="G217_IPAQ_TOT_WORK_MET",
             value=pb.col("check"),
-            pre=check_total_work_met(
-                "G217_IPAQ_JOB_VIG_D", "G217_IPAQ_JOB_VIG_HPD", "G217_IPAQ_JOB_VIG_MPD",
-                "G217_IPAQ_JOB_MOD_D", "G217_IPAQ_JOB_MOD_HPD", "G217_IPAQ_JOB_MOD_MPD",
-                "G217_IPAQ_JOB_WALK_D", "G217_IPAQ_JOB_WALK_HPD", "G217_IPAQ_JOB_WALK_MPD",
-            ),
+            pre=check_summed_met(met_categories["TOT_WORK_MET"]),
             na_pass=True
         )
-    ).interrogate()
-
-    return validation
-
-def check_total_work_met(
-    vig_d: str,
-    vig_hpd: str,
-    vig_mpd: str,
-    mod_d: str,
-    mod_hpd: str,
-    mod_mpd: str,
-    walk_d: str,
-    walk_hpd: str,
-    walk_mpd: str,
-    ) -> Callable:
-    """
-    Check Total Work MET
-    """
-    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        vig_met = 8 * pl.col(vig_d).fill_null(0) * pl.min_horizontal(180, pl.col(vig_hpd).fill_null(0) * 60 + pl.col(vig_mpd).fill_null(0))
-        mod_met = 4 * pl.col(mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(mod_hpd).fill_null(0) * 60 + pl.col(mod_mpd).fill_null(0))
-        walk_met = 3.3 * pl.col(walk_d).fill_null(0) * pl.min_horizontal(180, pl.col(walk_hpd).fill_null(0) * 60 + pl.col(walk_mpd).fill_null(0))
-        total_work_met = pl.sum_horizontal(col.round(2) for col in [vig_met, mod_met, walk_met])
-        return df.with_columns(total_work_met.alias("check"))
+    )
 
-    return preprocessor
+    return project_steps(validation).interrogate()
 
 
 def validate_transport(df: pl.DataFrame) -> pb.Validate:
 
     validation = (
-        pb.Validate(data=df)
+        pb.Validate(data=with_derived_columns(df))
         .col_vals_eq(
             columns=pb.starts_with("G217_IPAQ_TRANS_MV_"),
             value=0,
@@ -221,7 +249,7 @@ def validate_transport(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_TRANS_MV_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_TRANS_MV_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_TRANS_MV_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_TRANS_MV_MPD", 
@@ -247,7 +275,7 @@ def validate_transport(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_TRANS_BIKE_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_TRANS_BIKE_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_TRANS_BIKE_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_TRANS_BIKE_MPD", 
@@ -273,7 +301,7 @@ def validate_transport(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_TRANS_WALK_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_TRANS_WALK_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_TRANS_WALK_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_TRANS_WALK_MPD", 
@@ -292,40 +320,18 @@ def validate_transport(df: pl.DataFrame) -> pb.Validate:
         .col_vals_eq(
             columns="G217_IPAQ_TOT_TRANS_MET",
             value=pb.col("check"),
-            pre=check_total_transport_met(
-                "G217_IPAQ_TRANS_BIKE_D", "G217_IPAQ_TRANS_BIKE_HPD", "G217_IPAQ_TRANS_BIKE_MPD",
-                "G217_IPAQ_TRANS_WALK_D", "G217_IPAQ_TRANS_WALK_HPD", "G217_IPAQ_TRANS_WALK_MPD",
-            ),
+            pre=check_summed_met(met_categories["TOT_TRANS_MET"]),
             na_pass=True
         )
-    ).interrogate()
+    )
 
-    return validation
-
-def check_total_transport_met(
-    bike_d: str,
-    bike_hpd: str,
-    bike_mpd: str,
-    walk_d: str,
-    walk_hpd: str,
-    walk_mpd: str,
-    ) -> Callable:
-    """
-    Check Total Transport MET
-    """
-    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        bike_met = 6 * pl.col(bike_d).fill_null(0) * pl.min_horizontal(180, pl.col(bike_hpd).fill_null(0) * 60 + pl.col(bike_mpd).fill_null(0))
-        walk_met = 3.3 * pl.col(walk_d).fill_null(0) * pl.min_horizontal(180, pl.col(walk_hpd).fill_null(0) * 60 + pl.col(walk_mpd).fill_null(0))
-        total_work_met = pl.sum_horizontal(col.round(2) for col in [bike_met, walk_met])
-        return df.with_columns(total_work_met.alias("check"))
-
-    return preprocessor
+    return project_steps(validation).interrogate()
 
 
 def validate_home(df: pl.DataFrame) -> pb.Validate:
 
     validation = (
-        pb.Validate(data=df)
+        pb.Validate(data=with_derived_columns(df))
         .col_vals_eq(
             columns=pb.starts_with("G217_IPAQ_HOME_OUT_VIG_"),
             value=0,
@@ -372,7 +378,7 @@ def validate_home(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_HOME_OUT_VIG_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_HOME_OUT_VIG_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_HOME_OUT_VIG_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_HOME_OUT_VIG_MPD", 
@@ -398,7 +404,7 @@ def validate_home(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_HOME_OUT_MOD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_HOME_OUT_MOD_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_HOME_OUT_MOD_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_HOME_OUT_MOD_MPD", 
@@ -424,7 +430,7 @@ def validate_home(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_HOME_IN_MOD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_HOME_IN_MOD_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_HOME_IN_MOD_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_HOME_IN_MOD_MPD", 
@@ -443,45 +449,18 @@ def validate_home(df: pl.DataFrame) -> pb.Validate:
         .col_vals_eq(
             columns="G217_IPAQ_TOT_HOME_MET",
             value=pb.col("check"),
-            pre=check_total_home_met(
-                "G217_IPAQ_HOME_OUT_VIG_D", "G217_IPAQ_HOME_OUT_VIG_HPD", "G217_IPAQ_HOME_OUT_VIG_MPD",
-                "G217_IPAQ_HOME_OUT_MOD_D", "G217_IPAQ_HOME_OUT_MOD_HPD", "G217_IPAQ_HOME_OUT_MOD_MPD",
-                "G217_IPAQ_HOME_IN_MOD_D", "G217_IPAQ_HOME_IN_MOD_HPD", "G217_IPAQ_HOME_IN_MOD_MPD",
-            ),
+            pre=check_summed_met(met_categories["TOT_HOME_MET"]),
             na_pass=True
         )
-    ).interrogate()
-
-    return validation
-
-def check_total_home_met(
-    out_vig_d: str,
-    out_vig_hpd: str,
-    out_vig_mpd: str,
-    out_mod_d: str,
-    out_mod_hpd: str,
-    out_mod_mpd: str,
-    in_mod_d: str,
-    in_mod_hpd: str,
-    in_mod_mpd: str,
-    ) -> Callable:
-    """
-    Check Total Home MET
-    """
-    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        out_vig_met = 5.5 * pl.col(out_vig_d).fill_null(0) * pl.min_horizontal(180, pl.col(out_vig_hpd).fill_null(0) * 60 + pl.col(out_vig_mpd).fill_null(0))
-        out_mod_met = 4 * pl.col(out_mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(out_mod_hpd).fill_null(0) * 60 + pl.col(out_mod_mpd).fill_null(0))
-        in_mod_met = 3 * pl.col(in_mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(in_mod_hpd).fill_null(0) * 60 + pl.col(in_mod_mpd).fill_null(0))
-        total_home_met = pl.sum_horizontal(col.round(2) for col in [out_vig_met, out_mod_met, in_mod_met])
-        return df.with_columns(total_home_met.alias("check"))
+    )
 
-    return preprocessor
+    return project_steps(validation).interrogate()
 
 
 def validate_leisure(df: pl.DataFrame) -> pb.Validate:
 
     validation = (
-        pb.Validate(data=df)
+        pb.Validate(data=with_derived_columns(df))
         .col_vals_eq(
             columns=pb.starts_with("G217_IPAQ_LSR_VIG_"),
             value=0,
@@ -528,7 +507,7 @@ def validate_leisure(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_LSR_VIG_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_LSR_VIG_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_LSR_VIG_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_LSR_VIG_MPD", 
@@ -554,7 +533,7 @@ def validate_leisure(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_LSR_MOD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_LSR_MOD_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_LSR_MOD_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_LSR_MOD_MPD", 
@@ -580,7 +559,7 @@ def validate_leisure(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_LSR_WALK_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_LSR_WALK_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_LSR_WALK_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_LSR_WALK_MPD", 
@@ -599,75 +578,34 @@ def validate_leisure(df: pl.DataFrame) -> pb.Validate:
         .col_vals_eq(
             columns="G217_IPAQ_TOT_LSR_MET",
             value=pb.col("check"),
-            pre=check_total_leisure_met(
-                "G217_IPAQ_LSR_VIG_D", "G217_IPAQ_LSR_VIG_HPD", "G217_IPAQ_LSR_VIG_MPD",
-                "G217_IPAQ_LSR_MOD_D", "G217_IPAQ_LSR_MOD_HPD", "G217_IPAQ_LSR_MOD_MPD",
-                "G217_IPAQ_LSR_WALK_D", "G217_IPAQ_LSR_WALK_HPD", "G217_IPAQ_LSR_WALK_MPD",
-            ),
+            pre=check_summed_met(met_categories["TOT_LSR_MET"]),
             na_pass=True
         )
-    ).interrogate()
-
-    return validation
-
-def check_total_leisure_met(
-    vig_d: str,
-    vig_hpd: str,
-    vig_mpd: str,
-    mod_d: str,
-    mod_hpd: str,
-    mod_mpd: str,
-    walk_d: str,
-    walk_hpd: str,
-    walk_mpd: str,
-    ) -> Callable:
-    """
-    Check Total Leisure MET
-    """
-    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        vig_met = 8 * pl.col(vig_d).fill_null(0) * pl.min_horizontal(180, pl.col(vig_hpd).fill_null(0) * 60 + pl.col(vig_mpd).fill_null(0))
-        mod_met = 4 * pl.col(mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(mod_hpd).fill_null(0) * 60 + pl.col(mod_mpd).fill_null(0))
-        walk_met = 3.3 * pl.col(walk_d).fill_null(0) * pl.min_horizontal(180, pl.col(walk_hpd).fill_null(0) * 60 + pl.col(walk_mpd).fill_null(0))
-        total_work_met = pl.sum_horizontal(col.round(2) for col in [vig_met, mod_met, walk_met])
-        return df.with_columns(total_work_met.alias("check"))
+    )
 
-    return preprocessor
+    return project_steps(validation).interrogate()
 
 
 def validate_totals(df: pl.DataFrame) -> pb.Validate:
 
     validation = (
-        pb.Validate(data=df)
+        pb.Validate(data=with_derived_columns(df))
         .col_vals_eq(
             columns="G217_IPAQ_WALK_MET",
             value=pb.col("check"),
-            pre=check_walk_met(
-                "G217_IPAQ_JOB_WALK_D", "G217_IPAQ_JOB_WALK_HPD", "G217_IPAQ_JOB_WALK_MPD",
-                "G217_IPAQ_TRANS_WALK_D", "G217_IPAQ_TRANS_WALK_HPD", "G217_IPAQ_TRANS_WALK_MPD",
-                "G217_IPAQ_LSR_WALK_D", "G217_IPAQ_LSR_WALK_HPD", "G217_IPAQ_LSR_WALK_MPD",
-            ),
+            pre=check_summed_met(met_categories["WALK_MET"]),
             na_pass=True
         )
         .col_vals_eq(
             columns="G217_IPAQ_MOD_MET",
             value=pb.col("check"),
-            pre=check_mod_met(
-                "G217_IPAQ_JOB_MOD_D", "G217_IPAQ_JOB_MOD_HPD", "G217_IPAQ_JOB_MOD_MPD",
-                "G217_IPAQ_TRANS_BIKE_D", "G217_IPAQ_TRANS_BIKE_HPD", "G217_IPAQ_TRANS_BIKE_MPD",
-                "G217_IPAQ_HOME_OUT_VIG_D", "G217_IPAQ_HOME_OUT_VIG_HPD", "G217_IPAQ_HOME_OUT_VIG_MPD",
-                "G217_IPAQ_HOME_OUT_MOD_D", "G217_IPAQ_HOME_OUT_MOD_HPD", "G217_IPAQ_HOME_OUT_MOD_MPD",
-                "G217_IPAQ_HOME_IN_MOD_D", "G217_IPAQ_HOME_IN_MOD_HPD", "G217_IPAQ_HOME_IN_MOD_MPD",
-                "G217_IPAQ_LSR_MOD_D", "G217_IPAQ_LSR_MOD_HPD", "G217_IPAQ_LSR_MOD_MPD",
-            ),
+            pre=check_summed_met(met_categories["MOD_MET"], round_categories=False),
             na_pass=True
         )
         .col_vals_eq(
             columns="G217_IPAQ_VIG_MET",
             value=pb.col("check"),
-            pre=check_vig_met(
-                "G217_IPAQ_JOB_VIG_D", "G217_IPAQ_JOB_VIG_HPD", "G217_IPAQ_JOB_VIG_MPD",
-                "G217_IPAQ_LSR_VIG_D", "G217_IPAQ_LSR_VIG_HPD", "G217_IPAQ_LSR_VIG_MPD",
-            ),
+            pre=check_summed_met(met_categories["VIG_MET"], round_categories=False),
             na_pass=True
         )
         .col_vals_eq(
@@ -692,80 +630,47 @@ def validate_totals(df: pl.DataFrame) -> pb.Validate:
             na_pass=True,
             brief="Check `IPAQ_CAT` is correctly calculated."
         )
-    ).interrogate()
-
-    return validation
-
-def check_walk_met(
-    job_walk_d: str,
-    job_walk_hpd: str,
-    job_walk_mpd: str,
-    trans_walk_d: str,
-    trans_walk_hpd: str,
-    trans_walk_mpd: str,
-    lsr_walk_d: str,
-    lsr_walk_hpd: str,
-    lsr_walk_mpd: str,
-) -> Callable:
-    
-    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        job_walk_met = 3.3 * pl.col(job_walk_d).fill_null(0) * pl.min_horizontal(180, pl.col(job_walk_hpd).fill_null(0) * 60 + pl.col(job_walk_mpd).fill_null(0))
-        trans_walk_met = 3.3 * pl.col(trans_walk_d).fill_null(0) * pl.min_horizontal(180, pl.col(trans_walk_hpd).fill_null(0) * 60 + pl.col(trans_walk_mpd).fill_null(0))
-        lsr_walk_met = 3.3 * pl.col(lsr_walk_d).fill_null(0) * pl.min_horizontal(180, pl.col(lsr_walk_hpd).fill_null(0) * 60 + pl.col(lsr_walk_mpd).fill_null(0))
-        total_walk_met = pl.sum_horizontal(col.round(2) for col in [job_walk_met, trans_walk_met, lsr_walk_met])
-        return df.with_columns(total_walk_met.alias("check"))
+    )
 
-    return preprocessor
+    return project_steps(validation).interrogate()
+
+def expected_summed_met(
+    categories: list[str],
+    round_categories: bool = True,
+    ) -> pl.Expr:
+    "Expected summed MET, from the derived MET column of each category."
+    category_mets = [pl.col(derived_column(cat, "MET")) for cat in categories]
+    if round_categories:
+        category_mets = [col.round(2) for col in category_mets]
+    return pl.sum_horizontal(category_mets)
+
+def check_summed_met(
+    categories: list[str],
+    round_categories: bool = True,
+    ) -> Callable:
+    """
+    Returns a preprocessing function to verify a summed MET value (ie. `TOT_WORK_MET` or `VIG_MET`).
 
-def check_mod_met(
-    job_mod_d: str,
-    job_mod_hpd: str,
-    job_mod_mpd: str,
-    trans_bike_d: str,
-    trans_bike_hpd: str,
-    trans_bike_mpd: str,
-    home_out_vig_d: str,
-    home_out_vig_hpd: str,
-    home_out_vig_mpd: str,
-    home_out_mod_d: str,
-    home_out_mod_hpd: str,
-    home_out_mod_mpd: str,
-    home_in_mod_d: str,
-    home_in_mod_hpd: str,
-    home_in_mod_mpd: str,
-    lsr_mod_d: str,
-    lsr_mod_hpd: str,
-    lsr_mod_mpd: str,
-) -> Callable:
-    
+    Reads the per-category MET from the derived columns added by `with_derived_columns`,
+    rather than recalculating them from the raw columns for every check.
+    """
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        job_mod_met = 4 * pl.col(job_mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(job_mod_hpd).fill_null(0) * 60 + pl.col(job_mod_mpd).fill_null(0))
-        trans_bike_met = 6 * pl.col(trans_bike_d).fill_null(0) * pl.min_horizontal(180, pl.col(trans_bike_hpd).fill_null(0) * 60 + pl.col(trans_bike_mpd).fill_null(0))
-        home_out_vig_met = 5.5 * pl.col(home_out_vig_d).fill_null(0) * pl.min_horizontal(180, pl.col(home_out_vig_hpd).fill_null(0) * 60 + pl.col(home_out_vig_mpd).fill_null(0))
-        home_out_mod_met = 4 * pl.col(home_out_mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(home_out_mod_hpd).fill_null(0) * 60 + pl.col(home_out_mod_mpd).fill_null(0))
-        home_in_mod_met = 3 * pl.col(home_in_mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(home_in_mod_hpd).fill_null(0) * 60 + pl.col(home_in_mod_mpd).fill_null(0))
-        lsr_mod_met = 4 * pl.col(lsr_mod_d).fill_null(0) * pl.min_horizontal(180, pl.col(lsr_mod_hpd).fill_null(0) * 60 + pl.col(lsr_mod_mpd).fill_null(0))
-        total_mod_met = pl.sum_horizontal([job_mod_met, trans_bike_met, home_out_vig_met, home_out_mod_met, home_in_mod_met, lsr_mod_met])
-        return df.with_columns(total_mod_met.alias("check"))
+        return df.with_columns(expected_summed_met(categories, round_categories).alias("check"))
 
+    preprocessor.columns = [derived_column(cat, "MET") for cat in categories]
     return preprocessor
 
-def check_vig_met(
-    vig_job_d: str,
-    vig_job_hpd: str,
-    vig_job_mpd: str,
-    vig_lsr_d: str,
-    vig_lsr_hpd: str,
-    vig_lsr_mpd: str,
-) -> Callable:
-    
-    def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        vig_job_met = 8 * pl.col(vig_job_d).fill_null(0) * pl.min_horizontal(180, pl.col(vig_job_hpd).fill_null(0) * 60 + pl.col(vig_job_mpd).fill_null(0))
-        vig_lsr_met = 8 * pl.col(vig_lsr_d).fill_null(0) * pl.min_horizontal(180, pl.col(vig_lsr_hpd).fill_null(0) * 60 + pl.col(vig_lsr_mpd).fill_null(0))
-        total_vig_met = pl.sum_horizontal([vig_job_met, vig_lsr_met])
-        return df.with_columns(total_vig_met.alias("check"))
-
-    return preprocessor
+def expected_tot_met(
+    vig_met: str,
+    mod_met: str,
+    walk_met: str
+) -> pl.Expr:
+    "Expected total MET; None if any of `VIG_MET`, `MOD_MET` or `WALK_MET` are None."
+    return (
+        pl.when(pl.col(vig_met).is_null() | pl.col(mod_met).is_null() | pl.col(walk_met).is_null())
+        .then(None)
+        .otherwise(pl.sum_horizontal(pl.col(vig_met, mod_met, walk_met)))
+    )
 
 def check_tot_met(
     vig_met: str,
@@ -775,18 +680,53 @@ def check_tot_met(
 ) -> Callable:
     """Returns a preprocessing function to verify the calculated total MET value."""
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        expr = (
-            pl.when(pl.col(vig_met).is_null() | pl.col(mod_met).is_null() | pl.col(walk_met).is_null())
-            .then(None)
-            .otherwise(pl.sum_horizontal(pl.col(vig_met, mod_met, walk_met)))
-        )
-        
         return df.with_columns(
-            expr.alias("check"),
+            expected_tot_met(vig_met, mod_met, walk_met).alias("check"),
             pl.col(tot_met)
         )
+    preprocessor.columns = [vig_met, mod_met, walk_met, tot_met]
     return preprocessor
 
+def expected_ipaq_cat(
+    job_vig_days: str,
+    job_mod_days: str,
+    job_walk_days: str,
+    trans_bike_days: str,
+    trans_walk_days: str,
+    home_out_vig_days: str,
+    home_out_mod_days: str,
+    home_in_mod_days: str,
+    lsr_vig_days: str,
+    lsr_mod_days: str,
+    lsr_walk_days: str,
+    job_vig_hpd: str,
+    job_vig_mpd: str,
+    lsr_vig_hpd: str,
+    lsr_vig_mpd: str,
+    tot_met: str,
+    ) -> pl.Expr:
+    "Expected IPAQ category; see `check_ipaq_cat` for the criteria."
+    all_days = [
+        job_vig_days, job_mod_days, job_walk_days, trans_bike_days, trans_walk_days, home_out_vig_days, 
+        home_out_mod_days, home_in_mod_days, lsr_vig_days, lsr_mod_days, lsr_walk_days
+    ]
+    return (
+        pl.when(pl.col(tot_met).is_null()).then(None)
+        .when(
+            (pl.sum_horizontal(job_vig_days, lsr_vig_days).ge(3) & pl.col(tot_met).ge(1500)) | 
+            (pl.sum_horizontal(all_days).ge(7) & pl.col(tot_met).ge(3000))
+        ).then(2)
+        .when(
+            (pl.sum_horizontal(job_vig_days, lsr_vig_days).ge(3) & 
+                pl.sum_horizontal(
+                    pl.col(job_vig_hpd).fill_null(0)*60, pl.col(job_vig_mpd).fill_null(0),
+                    pl.col(lsr_vig_hpd).fill_null(0)*60, pl.col(lsr_vig_mpd).fill_null(0)
+                ).ge(20)) |
+            (pl.sum_horizontal(all_days).ge(5) & pl.col(tot_met).ge(600))
+        ).then(1)
+        .otherwise(0)
+    )
+
 def check_ipaq_cat(
     job_vig_days: str,
     job_mod_days: str,
@@ -827,37 +767,26 @@ def check_ipaq_cat(
     (For instance, 3 x VIG, 3 x MOD, 3 x WALK could be across as few as 3, or as many as 7 days).
     """
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        all_days = [
-            job_vig_days, job_mod_days, job_walk_days, trans_bike_days, trans_walk_days, home_out_vig_days, 
-            home_out_mod_days, home_in_mod_days, lsr_vig_days, lsr_mod_days, lsr_walk_days
-        ]
         return df.with_columns(
-            (pl.when(pl.col(tot_met).is_null()).then(None)
-            .when(
-                (pl.sum_horizontal(job_vig_days, lsr_vig_days).ge(3) & pl.col(tot_met).ge(1500)) | 
-                (pl.sum_horizontal(all_days).ge(7) & pl.col(tot_met).ge(3000))
-            ).then(2)
-            .when(
-                (pl.sum_horizontal(job_vig_days, lsr_vig_days).ge(3) & 
-                    pl.sum_horizontal(
-                        pl.col(job_vig_hpd).fill_null(0)*60, pl.col(job_vig_mpd).fill_null(0),
-                        pl.col(lsr_vig_hpd).fill_null(0)*60, pl.col(lsr_vig_mpd).fill_null(0)
-                    ).ge(20)) |
-                (pl.sum_horizontal(all_days).ge(5) & pl.col(tot_met).ge(600))
-            ).then(1)
-            .otherwise(0)
+            expected_ipaq_cat(
+                job_vig_days, job_mod_days, job_walk_days, trans_bike_days, trans_walk_days,
+                home_out_vig_days, home_out_mod_days, home_in_mod_days, lsr_vig_days, lsr_mod_days, lsr_walk_days,
+                job_vig_hpd, job_vig_mpd, lsr_vig_hpd, lsr_vig_mpd, tot_met
             ).alias("check"),
             pl.col(cat).fill_null(0) # Fill nulls with 0; otherwise the validation skips if one value in a comparison is null
         )
+    preprocessor.columns = [
+        job_vig_days, job_mod_days, job_walk_days, trans_bike_days, trans_walk_days, home_out_vig_days,
+        home_out_mod_days, home_in_mod_days, lsr_vig_days, lsr_mod_days, lsr_walk_days,
+        job_vig_hpd, job_vig_mpd, lsr_vig_hpd, lsr_vig_mpd, tot_met, cat
+    ]
     return preprocessor
 
 
-
-
 def validate_sit_stand_and_lying(df: pl.DataFrame) -> pb.Validate:
 
     validation = (
-        pb.Validate(data=df)
+        pb.Validate(data=with_derived_columns(df))
         .col_vals_eq(
             columns="G217_IPAQ_SIT_WD_TRUNC",
             value=pb.col("check"),
@@ -881,7 +810,7 @@ def validate_sit_stand_and_lying(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_STAND_WD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_STAND_WD_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_STAND_WD_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_STAND_WD_MPD", 
@@ -898,7 +827,7 @@ def validate_sit_stand_and_lying(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_STAND_WE_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_STAND_WE_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_STAND_WE_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_STAND_WE_MPD", 
@@ -915,7 +844,7 @@ def validate_sit_stand_and_lying(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_LYING_WD_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_LYING_WD_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_LYING_WD_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_LYING_WD_MPD", 
@@ -932,7 +861,7 @@ def validate_sit_stand_and_lying(df: pl.DataFrame) -> pb.Validate:
         .col_vals_expr(
             expr=pl.col("G217_IPAQ_LYING_WE_HPD") % 1 == 0,
             brief="Check HPD is a whole number.",
-            pre=lambda df: df.with_columns(pl.col("G217_IPAQ_LYING_WE_HPD").fill_null(0))
+            pre=fill_nulls("G217_IPAQ_LYING_WE_HPD", 0)
         )
         .col_vals_between(
             columns="G217_IPAQ_LYING_WE_MPD", 
@@ -942,7 +871,7 @@ def validate_sit_stand_and_lying(df: pl.DataFrame) -> pb.Validate:
         )
     )
 
-    return validation.interrogate()
+    return project_steps(validation).interrogate()
 
 def check_sit_trunc(
     hpd: str,
@@ -956,14 +885,64 @@ def check_sit_trunc(
     If both HPD and MPD are Null, SIT_TRUNC should be Null.
     """
     def preprocessor(df: pl.DataFrame) -> pl.DataFrame:
-        expr = (
-            pl.when(pl.col(hpd).is_null() & pl.col(mpd).is_null())
-            .then(None)
-            .otherwise(pl.min_horizontal(960, pl.col(hpd).fill_null(0) * 60 + pl.col(mpd).fill_null(0)))
-        )
-        
         return df.with_columns(
-            expr.alias("check"),
+            expected_sit_trunc(hpd, mpd).alias("check"),
             # pl.col(sit_trunc).fill_null(0) # Fill nulls with 0; otherwise the validation skips if one value in a comparison is null
         )
-    return preprocessor
\ No newline at end of file
+    preprocessor.columns = [hpd, mpd]
+    return preprocessor
+
+# Long-form domain validators, in the order they're reported
+long_validators = {
+    "jobs": validate_jobs,
+    "transport": validate_transport,
+    "home": validate_home,
+    "leisure": validate_leisure,
+    "totals": validate_totals,
+    "sit_stand_and_lying": validate_sit_stand_and_lying,
+}
+
+def summarise_validations(validations: dict[str, pb.Validate]) -> pl.DataFrame:
+    """
+    Merge the results of several validations into a single report, with one row per step.
+    """
+    rows = [
+        {
+            "validation": name,
+            "step": info.i,
+            "assertion_type": info.assertion_type,
+            "column": str(info.column),
+            "segments": None if info.segments is None else str(info.segments),
+            "n": info.n,
+            "n_passed": info.n_passed,
+            "n_failed": info.n_failed,
+            "all_passed": info.all_passed,
+        }
+        for name, validation in validations.items()
+        for info in validation.validation_info
+    ]
+    return pl.DataFrame(rows)
+
+def validate_all_long(
+    df: pl.DataFrame,
+    workers: int | None = None, # defaults to one thread per validator
+    ) -> tuple[dict[str, pb.Validate], pl.DataFrame]:
+    """
+    Run all of the long-form domain validators concurrently on a thread pool.
+
+    The validators only read from `df`, so every thread shares the same frame (and the same
+    derived columns, which are built once up front rather than raced for by each thread).
+
+    Pointblank holds the GIL while it builds each step (in Python, through narwhals), but every step ends
+    in a `LazyFrame.collect`, and Polars releases the GIL for that; so only the collects overlap across threads,
+    and the gain grows with the frame (see `benchmarks/validate_all_long.py`). `workers=1` runs them one at a time.
+
+    Returns the individual validations (in `long_validators` order) and the merged report.
+    """
+    with_derived_columns(df)
+
+    with ThreadPoolExecutor(max_workers=workers or len(long_validators)) as executor:
+        futures = {name: executor.submit(validator, df) for name, validator in long_validators.items()}
+        validations = {name: future.result() for name, future in futures.items()}
+
+    return validations, summarise_validations(validations)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+from pathlib import Path
+
+import polars as pl
+
+from failure_index import FailureIndex, failing_rows, row_runs
+from row_hash import column_fingerprints
+from rule_tree import input_columns
+from validate_lazy import Rules
+
+def definition_key(name: str, rule: pl.Expr) -> str:
+    """
+    Key a rule by its definition alone, so the key changes when the rule does (ie. a new threshold).
+
+    The rule is keyed by its serialisation rather than `str(rule)`, which prints the set of `is_in` as `[Series]`.
+    """
+    return hashlib.sha256(json.dumps([pl.__version__, name, rule.meta.serialize(format="json")]).encode()).hexdigest()
+
+def rule_key(
+    name: str,
+    rule: pl.Expr,
+    fingerprints: dict[str, str], # from `column_fingerprints`
+    id_column: str = "ID",
+) -> str:
+    "Key a rule's result by its definition and the fingerprints of the columns it reads."
+    columns = sorted({*input_columns(rule), id_column})
+    key = [definition_key(name, rule), [(column, fingerprints[column]) for column in columns]]
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+def validate_cached(
+    lf: pl.LazyFrame | pl.DataFrame,
+    rules: Rules,
+    cache: Path, # directory of cached results, created if missing
+    n_failing: int = 10,
+    id_column: str = "ID",
+) -> tuple[pl.DataFrame, FailureIndex]:
+    """
+    `validate_lazy` and `build_failure_index`, re-evaluating only the rules whose definition
+    or input columns have changed since they were cached.
+
+    Each rule's counts and failing-row runs are cached in `cache` as `<key>.parquet`,
+    along with the ID column as `ids-<fingerprint>.parquet`.
+    """
+    lf = lf.lazy()
+    cache.mkdir(parents=True, exist_ok=True)
+
+    columns = sorted({column for rule in rules.values() for column in input_columns(rule)} | {id_column})
+    fingerprints = column_fingerprints(lf, columns)
+    keys = {name: rule_key(name, rule, fingerprints, id_column) for name, rule in rules.items()}
+
+    ids_path = cache / f"ids-{hashlib.sha256(fingerprints[id_column].encode()).hexdigest()}.parquet"
+    if ids_path.exists():
+        ids = pl.read_parquet(ids_path).to_series()
+    else:
+        ids = lf.select(id_column).collect().to_series()
+        ids.to_frame().write_parquet(ids_path)
+
+    stale = {name: rule for name, rule in rules.items() if not (cache / f"{keys[name]}.parquet").exists()}
+    if stale:
+        # Each stale rule is evaluated once: its results are a bit per row, and both the counts
+        # and the failing-row runs are derived from them
+        checked = lf.select(*[rule.alias(name) for name, rule in stale.items()]).collect(streaming=True)
+        counts = checked.select(pl.all().is_not_null().sum()).row(0)
+        passed = checked.select(pl.all().sum()).row(0)
+        runs = row_runs(failing_rows(checked.lazy()).collect())
+        for name, n, n_passed in zip(stale, counts, passed):
+            (
+                runs.filter(pl.col("rule") == name)
+                .select(
+                    pl.lit(n, pl.Int64).alias("n"), pl.lit(n_passed, pl.Int64).alias("n_passed"),
+                    pl.col("start").implode(), pl.col("length").implode(),
+                )
+                .write_parquet(cache / f"{keys[name]}.parquet")
+            )
+
+    cached = pl.concat([
+        pl.read_parquet(cache / f"{keys[name]}.parquet").with_columns(pl.lit(name).alias("rule"))
+        for name in rules
+    ])
+    index = FailureIndex(
+        cached.select("rule", "start", "length").explode("start", "length").drop_nulls().sort("rule", "start"),
+        ids,
+    )
+    report = cached.select(
+        "rule", "n", "n_passed",
+        (pl.col("n") - pl.col("n_passed")).alias("n_failed"),
+        pl.Series("failing_ids", [index.failing_ids(name).head(n_failing) for name in rules], dtype=pl.List(ids.dtype)),
+    )
+    return report, index
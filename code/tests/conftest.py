@@ -0,0 +1,11 @@
+import pytest
+
+from fuzz import fuzz_long_form, fuzz_short_form
+
+@pytest.fixture
+def short_form():
+    return fuzz_short_form
+
+@pytest.fixture
+def long_form():
+    return fuzz_long_form
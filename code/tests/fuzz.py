@@ -0,0 +1,47 @@
+import numpy as np
+import polars as pl
+
+import harmonise_long
+
+def _maybe_null(rng: np.random.Generator, values: np.ndarray, p: float = 0.1) -> list:
+    "`values`, with about `p` of them null."
+    return [None if rng.random() < p else value for value in values.tolist()]
+
+def fuzz_short_form(prefix: str, n: int = 500, seed: int = 0) -> pl.DataFrame:
+    """
+    A short form dataset of `n` rows, with values in and out of range (ie. 999 and 1.5 hours) and nulls,
+    so every branch of the rules is taken.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {"ID": np.arange(n, dtype=np.float64)}
+    for cat in ["VIG", "MOD", "WALK"]:
+        columns[f"{prefix}_IPAQ_{cat}_W"] = _maybe_null(rng, rng.choice([0, 1, 1, 999], n).astype(float))
+        columns[f"{prefix}_IPAQ_{cat}_D"] = _maybe_null(rng, rng.integers(0, 9, n).astype(float))
+        columns[f"{prefix}_IPAQ_{cat}_HPD"] = _maybe_null(rng, rng.choice([0, 1, 2, 1.5, 17, 20, 30, 999], n).astype(float))
+        columns[f"{prefix}_IPAQ_{cat}_MPD"] = _maybe_null(rng, rng.choice([0, 5, 10, 30, 45, 60, 90, 999], n).astype(float))
+        columns[f"{prefix}_IPAQ_{cat}_MINS"] = _maybe_null(rng, rng.integers(0, 200, n).astype(float))
+        columns[f"{prefix}_IPAQ_{cat}_MET"] = _maybe_null(rng, rng.integers(0, 2000, n).astype(float))
+    for day in ["WD", "WE"]:
+        columns[f"{prefix}_IPAQ_SIT_{day}_HPD"] = _maybe_null(rng, rng.choice([0, 1, 5, 999], n).astype(float))
+        columns[f"{prefix}_IPAQ_SIT_{day}_MPD"] = _maybe_null(rng, rng.choice([0, 10, 30, 999], n).astype(float))
+        columns[f"{prefix}_IPAQ_SIT_{day}_TRUNC"] = _maybe_null(rng, rng.integers(0, 900, n).astype(float))
+    columns[f"{prefix}_IPAQ_TOT_MET"] = [None] * n
+    columns[f"{prefix}_IPAQ_CAT"] = [None] * n
+    return pl.DataFrame(columns, strict=False).with_columns(pl.col(pl.Null).cast(pl.Float64))
+
+def fuzz_long_form(n: int = 500, seed: int = 0) -> pl.DataFrame:
+    "A G217 dataset of `n` rows with every column of `sorted_columns`, fuzzed as `fuzz_short_form` is."
+    rng = np.random.default_rng(seed)
+    columns = {"ID": np.arange(n, dtype=np.float64)}
+    columns["G217_IPAQ_JOB"] = _maybe_null(rng, rng.integers(0, 2, n).astype(float))
+    for cat in harmonise_long.categories:
+        # SIT, STAND and LYING only have HPD and MPD
+        if not any(c in cat for c in ["SIT", "STAND", "LYING"]):
+            columns[f"G217_IPAQ_{cat}"] = _maybe_null(rng, rng.integers(0, 2, n).astype(float))
+            columns[f"G217_IPAQ_{cat}_D"] = _maybe_null(rng, rng.integers(0, 9, n).astype(float))
+        columns[f"G217_IPAQ_{cat}_HPD"] = _maybe_null(rng, rng.choice([0, 1, 2, 3, 4.5, 17, 20, 25, 999], n).astype(float))
+        columns[f"G217_IPAQ_{cat}_MPD"] = _maybe_null(rng, rng.choice([0, 5, 10, 30, 45, 60, 90, 999], n).astype(float))
+    df = pl.DataFrame(columns, strict=False)
+    return df.with_columns(
+        pl.lit(None, pl.Float64).alias(column) for column in harmonise_long.sorted_columns if column not in df.columns
+    ).select(harmonise_long.sorted_columns)
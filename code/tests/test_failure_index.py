@@ -0,0 +1,58 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal, assert_series_equal
+
+from failure_index import FailureIndex, build_failure_index
+from validate_lazy import short_form_rules
+
+@pytest.fixture
+def validated(short_form):
+    "A G220 frame before harmonising (so many rows fail), its rules, and their failure index."
+    df = short_form("G220")
+    rules = short_form_rules("G220")
+    return df, rules, build_failure_index(df, rules)
+
+def failing(df: pl.DataFrame, rule: pl.Expr) -> set[int]:
+    "The positions of the rows which fail `rule`, evaluated directly."
+    return set(df.with_row_index("row").filter(rule.not_())["row"])
+
+def test_rows_match_each_rule_evaluated_directly(validated):
+    df, rules, index = validated
+    for name, rule in rules.items():
+        assert set(index.rows(name)) == failing(df, rule)
+    assert set(index.rules) == {name for name, rule in rules.items() if failing(df, rule)}
+    assert len(index.runs) < sum(len(index.rows(name)) for name in index.rules) # failures cluster into runs
+
+def test_union_and_intersect(validated):
+    df, rules, index = validated
+    a, b = [name for name in index.rules if "VIG" in name][:2]
+
+    assert set(index.union(a, b)) == failing(df, rules[a]) | failing(df, rules[b])
+    assert set(index.intersect(a, b)) == failing(df, rules[a]) & failing(df, rules[b])
+    assert index.union(a, b).is_sorted()
+
+def test_no_rules_or_an_unknown_rule_match_no_rows(validated):
+    _, _, index = validated
+    empty = pl.Series("row", [], dtype=pl.UInt32)
+    assert_series_equal(index.union(), empty)
+    assert_series_equal(index.intersect(), empty)
+    assert_series_equal(index.rows("not a rule"), empty)
+
+def test_failing_ids_and_fetch(validated):
+    df, rules, index = validated
+    name = index.rules[0]
+    expected = df.filter(rules[name].not_())
+
+    assert index.failing_ids(name).to_list() == expected["ID"].to_list()
+    assert_frame_equal(index.fetch(name, df), expected)
+    assert_frame_equal(index.fetch(name, df.lazy()), expected)
+    assert_frame_equal(index.fetch(index.union(*index.rules[:3]), df), df[index.union(*index.rules[:3])])
+
+def test_save_and_load(validated, tmp_path):
+    _, _, index = validated
+    index.save(tmp_path / "index")
+    loaded = FailureIndex.load(tmp_path / "index")
+
+    assert_frame_equal(loaded.runs, index.runs)
+    assert_series_equal(loaded.ids, index.ids)
+    assert all(loaded.rows(name).equals(index.rows(name)) for name in index.rules)
@@ -0,0 +1,16 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from harmonise import harmonise_ipaq, min_inactive_share, no_activity
+
+@pytest.mark.parametrize("dset", ["G220", "G222", "G126"])
+@pytest.mark.parametrize("inactive_share", [0.9, 1.0])
+def test_skip_inactive_matches_harmonising_every_row(short_form, dset, inactive_share):
+    df = short_form(dset, n=1000)
+    # No W for any category in most rows, so `harmonise_active_rows` takes its sparse branch
+    inactive = pl.int_range(pl.len()) < inactive_share * pl.len()
+    df = df.with_columns(pl.when(~inactive).then(pl.col(f"^{dset}_IPAQ_.*_W$")))
+    assert df.select(no_activity(dset).mean()).item() > min_inactive_share
+
+    assert_frame_equal(harmonise_ipaq(dset, df, skip_inactive=True), harmonise_ipaq(dset, df, skip_inactive=False))
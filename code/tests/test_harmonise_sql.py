@@ -0,0 +1,54 @@
+import io
+
+import duckdb
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from harmonise_sql import harmonise_duckdb
+from rule_tree import expression_tree, literal_value
+from schedule import dataset_stages, harmonise_dataset
+
+DATASETS = ["G126", "G217", "G220", "G222", "G227", "G228"]
+
+def test_expression_tree_format():
+    # The compiler walks Polars' JSON serialisation, which isn't stable across versions,
+    # so this pins the nodes it reads (`polars` is pinned in requirements.txt)
+    expr = pl.when(pl.col("a").is_null()).then(pl.sum_horizontal(pl.col("a", "b")) + 1).otherwise(None).alias("c")
+    options = {"collect_groups": "ElementWise", "check_lengths": True, "flags": "ALLOW_GROUP_AWARE"}
+    assert expression_tree(expr) == {"Alias": [
+        {"Ternary": {
+            "predicate": {"Function": {"input": [{"Column": "a"}], "function": {"Boolean": "IsNull"}, "options": options}},
+            "truthy": {"BinaryExpr": {
+                "left": {"Function": {
+                    "input": [{"Columns": ["a", "b"]}],
+                    "function": {"SumHorizontal": {"ignore_nulls": True}},
+                    "options": options | {"flags": "ALLOW_GROUP_AWARE | INPUT_WILDCARD_EXPANSION"},
+                }},
+                "op": "Plus",
+                "right": {"Literal": {"Int": 1}},
+            }},
+            "falsy": {"Literal": "Null"},
+        }},
+        "c",
+    ]}
+
+@pytest.mark.parametrize("dset", DATASETS)
+def test_expression_tree_round_trip(dset):
+    stages, _ = dataset_stages(dset, [])
+    for expr in (expr for stage in stages for expr in stage):
+        # `meta.eq` is false for the Series literals of `is_in`, so compare the serialisations
+        serialised = expr.meta.serialize(format="json")
+        assert pl.Expr.deserialize(io.StringIO(serialised), format="json").meta.serialize(format="json") == serialised
+
+def test_literal_value():
+    tree = expression_tree(pl.col("a").is_in([1, 2]))
+    assert literal_value(tree["Function"]["input"][1]) == [1, 2]
+
+@pytest.mark.parametrize("dset", DATASETS)
+def test_harmonise_duckdb_matches_polars(short_form, long_form, dset):
+    df = long_form() if dset == "G217" else short_form(dset)
+    con = duckdb.connect()
+    con.register("interim", df)
+
+    assert_frame_equal(harmonise_duckdb(con, dset, "interim").pl(), harmonise_dataset(dset, df))
@@ -0,0 +1,47 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+import pytest
+from polars.testing import assert_frame_equal
+
+from ipc_stream import harmonise_ipc_stream
+from schedule import harmonise_dataset
+
+def ipc_stream(df: pl.DataFrame, batch_rows: int) -> bytes:
+    "`df` as an Arrow IPC stream of `batch_rows`-row batches."
+    table = df.to_arrow()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+    return sink.getvalue()
+
+@pytest.mark.parametrize("dset", ["G220", "G222", "G217"])
+def test_harmonise_ipc_stream_matches_harmonise_dataset(short_form, long_form, dset):
+    df = long_form() if dset == "G217" else short_form(dset)
+    sink = io.BytesIO()
+
+    # 500 rows in 5 batches
+    n_rows = harmonise_ipc_stream(dset, io.BytesIO(ipc_stream(df, batch_rows=120)), sink)
+
+    assert n_rows == df.height
+    assert_frame_equal(pl.read_ipc_stream(sink.getvalue()), harmonise_dataset(dset, df))
+
+def test_harmonise_ipc_stream_of_an_empty_stream(short_form):
+    df = short_form("G220").clear()
+    sink = io.BytesIO()
+
+    assert harmonise_ipc_stream("G220", io.BytesIO(ipc_stream(df, batch_rows=120)), sink) == 0
+    assert_frame_equal(pl.read_ipc_stream(sink.getvalue()), harmonise_dataset("G220", df))
+
+def test_ipc_stream_in_a_shell_pipeline(short_form):
+    df = short_form("G222")
+    src = Path(__file__).parents[1] / "src"
+    result = subprocess.run(
+        [sys.executable, src / "ipc_stream.py", "G222"], input=ipc_stream(df, batch_rows=200), capture_output=True, check=True,
+    )
+    assert_frame_equal(pl.read_ipc_stream(result.stdout), harmonise_dataset("G222", df))
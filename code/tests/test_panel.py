@@ -0,0 +1,45 @@
+from functools import reduce
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from config import DATASETS
+from panel import build_panel, measures, scan_wave
+
+# Three waves with overlapping participants; G217 has no VIG_MINS, and G126's IPAQ_CAT is Float64 as in a SAV file
+toy_waves = {
+    "G126": pl.DataFrame({"ID": [1.0, 2, 3, 5], "G126_IPAQ_VIG_MINS": [10.0, None, 30, 50], "G126_IPAQ_CAT": [0.0, 1, None, 2]}),
+    "G217": pl.DataFrame({"ID": [2.0, 3, 4], "G217_IPAQ_TOT_MET": [600.0, 1200, None], "G217_IPAQ_CAT": pl.Series([1, 1, 0], dtype=pl.Int32)}),
+    "G220": pl.DataFrame({"ID": [1.0, 4, 5, 6], "G220_IPAQ_VIG_MINS": [20.0, 40, None, 60], "G220_IPAQ_CAT": pl.Series([2, None, 0, 1], dtype=pl.Int32)}),
+}
+
+@pytest.fixture
+def waves(tmp_path):
+    for dset, df in toy_waves.items():
+        df.write_parquet((tmp_path / DATASETS[dset]["file"]).with_suffix(".parquet"))
+    return {dset: scan_wave(dset, tmp_path) for dset in toy_waves}
+
+def test_wide_panel_matches_full_joins(waves):
+    expected = reduce(
+        lambda left, right: left.join(right, on="ID", how="full", coalesce=True),
+        (lf.collect() for lf in waves.values()),
+    ).sort("ID")
+
+    panel = build_panel(waves, how="wide").collect()
+
+    assert_frame_equal(panel, expected)
+    assert panel["ID"].to_list() == [1, 2, 3, 4, 5, 6]
+    assert all(panel.schema[f"{dset}_IPAQ_CAT"] == pl.Int32 for dset in waves)
+
+def test_long_panel_is_sorted_by_id_then_wave(waves):
+    panel = build_panel(waves, how="long").collect()
+
+    assert panel.select("ID", pl.col("wave").cast(pl.String)).rows() == [
+        (1, "G126"), (1, "G220"), (2, "G126"), (2, "G217"), (3, "G126"), (3, "G217"),
+        (4, "G217"), (4, "G220"), (5, "G126"), (5, "G220"), (6, "G220"),
+    ]
+    assert panel.columns == ["ID", "wave", *measures]
+    assert panel.schema["IPAQ_CAT"] == pl.Int32
+    assert panel["IPAQ_CAT"].to_list() == [0, 2, 1, 1, None, 1, 0, None, 2, 0, 1]
+    assert panel.filter(pl.col("wave") == "G217")["IPAQ_VIG_MINS"].is_null().all()
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from pipeline import run_pipeline
+
+def test_run_pipeline_processes_every_item_in_order():
+    written = []
+    run_pipeline(range(10), lambda k: k * 10, lambda k, data: data + k, lambda k, data: written.append((k, data)))
+    assert written == [(k, k * 11) for k in range(10)]
+
+def test_run_pipeline_overlaps_the_stages():
+    # The first item can only be written once the next has been read, so this deadlocks (and times out) unless
+    # the stages run at the same time
+    read_second = threading.Event()
+
+    def read(k):
+        if k == 1:
+            read_second.set()
+        return k
+
+    def write(k, data):
+        if k == 0 and not read_second.wait(timeout=5):
+            raise TimeoutError("the next item wasn't read while this one was written")
+
+    run_pipeline(range(3), read, lambda k, data: data, write)
+
+def test_run_pipeline_holds_back_the_reader():
+    read, written = [], []
+    release = threading.Event()
+
+    def write(k, data):
+        release.wait(timeout=5)
+        written.append(k)
+
+    thread = threading.Thread(target=run_pipeline, args=(range(20), lambda k: read.append(k), lambda k, data: data, write))
+    thread.start()
+    threading.Event().wait(0.5)
+    # One item being written, one in each queue and one being processed, and the reader blocked on the next
+    assert len(read) <= 5
+    release.set()
+    thread.join()
+    assert written == list(range(20))
+
+@pytest.mark.parametrize("stage", ["read", "process", "write"])
+def test_run_pipeline_stops_and_raises_on_an_error_in_any_stage(stage):
+    read = []
+
+    def run(name):
+        def run_stage(k, *data):
+            if name == "read":
+                read.append(k)
+            if name == stage and k == 3:
+                raise ValueError(f"{name} failed")
+            return k
+        return run_stage
+
+    with pytest.raises(ValueError, match=f"{stage} failed"):
+        run_pipeline(range(100), run("read"), run("process"), run("write"))
+    # The other stages stopped rather than running to the end
+    assert len(read) < 100
@@ -0,0 +1,19 @@
+import pytest
+
+from plan import missing_harmonise_columns
+
+@pytest.mark.parametrize("dset", ["G126", "G220", "G222", "G227", "G228"])
+def test_missing_harmonise_columns_short_form(short_form, dset):
+    columns = short_form(dset, n=10).columns
+    assert missing_harmonise_columns(dset, columns) == []
+
+    dropped = [f"{dset}_IPAQ_VIG_W", f"{dset}_IPAQ_MOD_HPD"]
+    assert missing_harmonise_columns(dset, [c for c in columns if c not in dropped]) == dropped
+
+def test_missing_harmonise_columns_long_form(long_form):
+    columns = long_form(n=10).columns
+    assert missing_harmonise_columns("G217", columns) == []
+
+    # A column the rules read, one only in `pl.col(a, b)` (the totals), and one only in `sorted_columns`
+    dropped = ["G217_IPAQ_JOB_VIG", "G217_IPAQ_LSR_WALK_MPD", "G217_CBCL_TOT_RS"]
+    assert missing_harmonise_columns("G217", [c for c in columns if c not in dropped]) == dropped
@@ -0,0 +1,76 @@
+import polars as pl
+import pyreadstat
+
+import main
+from config import DATASETS
+from row_hash import HASH, content_fingerprint, hashes_path, with_row_hash
+
+def row_hash(df: pl.DataFrame) -> list[int]:
+    return with_row_hash(df).collect()[HASH].to_list()
+
+toy = pl.DataFrame({
+    "ID": [1, 2, 3, 4, 5, 6],
+    "G220_IPAQ_VIG_D": [3.0, None, float("nan"), float("inf"), 0.5, -2.25],
+    "G220_IPAQ_VIG_W": [1, 0, None, 1, 999, -1],
+})
+
+def test_row_hash_is_pinned():
+    # Hashes are stored next to the processed files, so they must never change, whatever the Polars version
+    assert row_hash(toy) == [
+        11328446399841366081, 2934852898012243082, 14020486397684109641,
+        15637343750319071454, 17103674212936973648, 15391387738305143495,
+    ]
+
+def test_row_hash_ignores_column_order_and_int_or_float():
+    assert row_hash(toy.select("G220_IPAQ_VIG_W", "G220_IPAQ_VIG_D", "ID")) == row_hash(toy)
+    assert row_hash(toy.with_columns(pl.col("G220_IPAQ_VIG_W").cast(pl.Float64))) == row_hash(toy)
+    assert row_hash(toy.with_columns(pl.col("G220_IPAQ_VIG_W").cast(pl.Int16))) == row_hash(toy)
+
+def test_row_hash_of_non_finite_values():
+    df = pl.DataFrame({"G220_IPAQ_VIG_D": [None, float("nan"), float("inf"), -float("inf"), 2.0**70, 0.0]})
+    null, nan, inf, minus_inf, huge, zero = row_hash(df)
+    # NaN, infinities and values outside the Int64 range hash as null, as documented
+    assert null == nan == inf == minus_inf == huge
+    assert zero != null
+
+def test_row_hash_changes_with_a_value_or_its_column():
+    hashes = row_hash(toy)
+    # Only the first row's value changes, and only in its fraction
+    nudged = row_hash(toy.with_columns(pl.col("G220_IPAQ_VIG_D") + pl.when(pl.col("ID") == 1).then(2.0**-40).otherwise(0)))
+    assert nudged[0] != hashes[0] and nudged[1:] == hashes[1:]
+    # The same values, in each other's columns
+    swapped = toy.rename({"G220_IPAQ_VIG_D": "G220_IPAQ_VIG_W", "G220_IPAQ_VIG_W": "G220_IPAQ_VIG_D"})
+    assert row_hash(swapped)[0] != hashes[0]
+
+metadata = {"label": {"G220_IPAQ_VIG_D": "Days of vigorous activity"}, "field_values": {"G220_IPAQ_VIG_W": {0: "No", 1: "Yes"}}}
+
+def test_content_fingerprint_changes_with_values_order_and_metadata():
+    fingerprint = content_fingerprint(toy, metadata)
+
+    assert content_fingerprint(toy.clone().lazy(), {**metadata}) == fingerprint
+    assert content_fingerprint(toy.with_columns(pl.col("G220_IPAQ_VIG_W").replace(999, 9)), metadata) != fingerprint
+    assert content_fingerprint(toy.reverse(), metadata) != fingerprint
+    assert content_fingerprint(toy, {**metadata, "label": {"G220_IPAQ_VIG_D": "Days"}}) != fingerprint
+
+def test_main_only_rewrites_changed_files(short_form, tmp_path, monkeypatch):
+    interim, processed = tmp_path / "interim", tmp_path / "processed"
+    interim.mkdir(), processed.mkdir()
+    written = []
+    monkeypatch.setattr(main, "DATASETS", {"G220": DATASETS["G220"]})
+    monkeypatch.setattr(main, "INTERIM_DATA", interim)
+    monkeypatch.setattr(main, "PROCESSED_DATA", processed)
+    monkeypatch.setattr(main, "MANIFEST", processed / "manifest.json")
+    monkeypatch.setattr(main, "update_metadata", lambda lf, meta, new_meta: meta)
+    monkeypatch.setattr(main, "write_sav", lambda path, lf, meta: written.append(path) or path.touch())
+
+    file = interim / DATASETS["G220"]["file"]
+    df = short_form("G220")
+    pyreadstat.write_sav(df.to_pandas(), file)
+    main.main(n_workers=1, direct=True)
+    main.main(n_workers=1, direct=True)
+    assert written == [processed / file.name]
+    assert hashes_path(processed / file.name).exists()
+
+    pyreadstat.write_sav(df.with_columns(pl.col("G220_IPAQ_VIG_D").fill_null(2)).to_pandas(), file)
+    main.main(n_workers=1, direct=True)
+    assert written == [processed / file.name] * 2
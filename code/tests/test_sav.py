@@ -0,0 +1,76 @@
+import polars as pl
+import pyreadstat
+import pytest
+from polars.testing import assert_frame_equal
+
+import make_interim
+import sav
+from sav import _read_rows, read_sav_metadata, read_sav_parallel
+from utils import read_data
+
+# A small raw survey file, with an ID, IPAQ answers (999 is a missing code) and a string
+toy_sav = pl.DataFrame({
+    "ID": [3.0, 1, 2, 4, 5],
+    "G220_IPAQ_VIG_W": [1.0, 0, None, 1, 999],
+    "G220_IPAQ_VIG_HPD": [1.5, None, 2, 0, 17],
+    "NOTES": ["a", "", "ccc", "d", "e"],
+})
+
+@pytest.fixture
+def sav_file(tmp_path):
+    path = tmp_path / "G220_Q.sav"
+    pyreadstat.write_sav(
+        toy_sav.to_pandas(), path,
+        column_labels={"G220_IPAQ_VIG_W": "Vigorous activity in the last week"},
+        variable_value_labels={"G220_IPAQ_VIG_W": {0.0: "No", 1.0: "Yes", 999.0: "Missing"}},
+        variable_format={"ID": "F8.0", "G220_IPAQ_VIG_HPD": "F8.2", "NOTES": "A10"},
+        variable_measure={"G220_IPAQ_VIG_W": "nominal", "G220_IPAQ_VIG_HPD": "scale"},
+    )
+    return path
+
+def test_read_data_decodes_directly_when_asked(sav_file, monkeypatch):
+    # Any file is large enough to decode across processes
+    monkeypatch.setattr(sav, "PARALLEL_CELLS", 0)
+
+    df, meta = read_data(sav_file.name, sav_file.parent, direct=True, n_workers=2)
+
+    assert_frame_equal(df, _read_rows(sav_file))
+    assert meta == sav.read_sav_metadata(sav_file)[0]
+
+def test_create_interim_spss_files_decodes_directly_when_asked(sav_file, monkeypatch):
+    written = {}
+    monkeypatch.setattr(make_interim, "RAW_DATA", sav_file.parent)
+    monkeypatch.setattr(make_interim, "write_sav", lambda path, lf, meta: written.update(lf=lf.collect(), meta=meta))
+    config = {"G220": {"file": sav_file.name, "delete": ["NOTES"], "rename": {"G220_IPAQ_VIG_HPD": "G220_IPAQ_VIG_HOURS"}}}
+
+    make_interim.create_interim_spss_files(config, "G220", direct=True, n_workers=1)
+
+    assert written["lf"].columns == ["ID", "G220_IPAQ_VIG_W", "G220_IPAQ_VIG_HOURS"]
+    assert written["lf"]["ID"].to_list() == [1, 2, 3, 4, 5]
+    assert written["meta"]["label"]["G220_IPAQ_VIG_W"] == "Vigorous activity in the last week"
+    assert "G220_IPAQ_VIG_HOURS" in written["meta"]["decimals"]
+
+def test_read_rows_round_trips_values_and_nulls(sav_file):
+    assert_frame_equal(_read_rows(sav_file), toy_sav)
+    assert_frame_equal(_read_rows(sav_file, row_offset=1, row_limit=3), toy_sav.slice(1, 3))
+
+def test_read_sav_metadata_has_the_labels_and_formats(sav_file):
+    meta, n_rows = read_sav_metadata(sav_file)
+
+    assert n_rows == toy_sav.height
+    assert list(meta["label"]) == toy_sav.columns
+    assert meta["label"]["G220_IPAQ_VIG_W"] == "Vigorous activity in the last week"
+    assert meta["field_values"]["G220_IPAQ_VIG_W"] == {0: "No", 1: "Yes", 999: "Missing"}
+    assert meta["field_values"]["ID"] == {}
+    assert meta["field_type"] == {"ID": "Numeric", "G220_IPAQ_VIG_W": "Numeric", "G220_IPAQ_VIG_HPD": "Numeric", "NOTES": "String"}
+    assert (meta["field_width"]["G220_IPAQ_VIG_HPD"], meta["decimals"]["G220_IPAQ_VIG_HPD"]) == (8, 2)
+    assert (meta["field_width"]["NOTES"], meta["decimals"]["NOTES"]) == (10, 0)
+    assert meta["variable_type"]["G220_IPAQ_VIG_W"] == "nominal"
+
+@pytest.mark.parametrize("n_workers", [2, 3])
+def test_read_sav_parallel_matches_one_serial_read(tmp_path, short_form, n_workers):
+    # Rows which don't divide evenly between the workers, with nulls in every column
+    path = tmp_path / "G220_Q.sav"
+    pyreadstat.write_sav(short_form("G220", n=1001).to_pandas(), path)
+
+    assert_frame_equal(read_sav_parallel(path, 1001, n_workers), _read_rows(path))
@@ -0,0 +1,39 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from schedule import chunk_counts, harmonise_all, harmonise_dataset, plan_tasks
+
+def test_chunk_counts_splits_every_dataset_across_the_workers():
+    costs = {"G217": 1_000_000, "G220": 20_000, "G222": 1_000}
+
+    assert chunk_counts(costs, n_workers=8) == {"G217": 32, "G220": 1, "G222": 1}
+    assert chunk_counts(costs, n_workers=8, min_chunks=8) == {"G217": 32, "G220": 8, "G222": 8}
+
+def test_harmonise_all_matches_harmonise_dataset_for_one_chunked_dataset(short_form):
+    df = short_form("G222")
+    # As `main` chunks it: a small share of the total, harmonised on its own
+    n_chunks = chunk_counts({"G217": 100 * df.height * df.width, "G222": df.height * df.width}, 2, min_chunks=2)
+
+    assert len(plan_tasks({"G222": df}, 2, {"G222": n_chunks["G222"]})) == 2
+    harmonised = harmonise_all({"G222": df}, n_workers=2, n_chunks=n_chunks)["G222"]
+    assert_frame_equal(harmonised, harmonise_dataset("G222", df))
+
+def test_plan_tasks_balances_the_datasets_largest_first(short_form, long_form):
+    datasets = {"G217": long_form(n=400), "G220": short_form("G220", n=100), "G222": short_form("G222", n=50)}
+
+    tasks = plan_tasks(datasets, n_workers=2)
+
+    assert [task.cost for task in tasks] == sorted((task.cost for task in tasks), reverse=True)
+    assert tasks[0].dset == "G217" and sum(task.dset == "G217" for task in tasks) > 1
+    for dset, df in datasets.items():
+        chunks = sorted((task for task in tasks if task.dset == dset), key=lambda task: task.chunk)
+        assert_frame_equal(pl.concat([task.df for task in chunks]), df)
+
+def test_harmonise_all_reassembles_every_dataset_in_row_order(short_form, long_form):
+    datasets = {"G217": long_form(n=400), "G220": short_form("G220", n=100), "G126": short_form("G126", n=50)}
+
+    harmonised = harmonise_all(datasets, n_workers=2)
+
+    assert list(harmonised) == list(datasets)
+    for dset, df in datasets.items():
+        assert_frame_equal(harmonised[dset], harmonise_dataset(dset, df))
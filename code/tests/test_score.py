@@ -0,0 +1,19 @@
+import pytest
+
+from schedule import harmonise_dataset
+from score import score_long, score_short
+
+@pytest.mark.parametrize("dset", ["G126", "G220", "G222", "G227", "G228"])
+def test_score_short_matches_harmonise_dataset(short_form, dset):
+    df = short_form(dset)
+    expected = harmonise_dataset(dset, df).to_dicts()
+    assert [score_short(record) for record in df.to_dicts()] == expected
+
+def test_score_long_matches_harmonise_dataset(long_form):
+    df = long_form()
+    expected = harmonise_dataset("G217", df).to_dicts()
+    assert [score_long(record) for record in df.to_dicts()] == expected
+
+def test_score_short_needs_ipaq_columns_or_a_prefix():
+    with pytest.raises(ValueError, match="No IPAQ columns"):
+        score_short({"ID": 1})
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from schedule import harmonise_dataset
+from service import MicroBatcher, Metrics, request, serve
+
+async def _requests(lines: list[bytes]) -> list[dict]:
+    "Pipeline `lines` to a service on an unused port, so they're harmonised in one micro-batch, and read the responses."
+    server = await serve(port=0, batcher=MicroBatcher(max_delay=0.05))
+    async with server:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        writer.write(b"".join(lines))
+        responses = [json.loads(await reader.readline()) for _ in lines]
+        metrics = await request(reader, writer, {"metrics": None})
+        writer.close()
+    return responses + [metrics]
+
+def test_a_bad_record_only_fails_itself(short_form):
+    df = short_form("G220", n=5)
+    records = df.to_dicts()
+    bad = records[0] | {"G220_IPAQ_VIG_W": "yes"}
+    lines = [json.dumps({"dataset": "G220", "record": r}).encode() + b"\n" for r in [*records[:2], bad, *records[2:]]]
+
+    *responses, metrics = asyncio.run(_requests(lines))
+
+    assert "error" in responses[2]
+    expected = harmonise_dataset("G220", df).to_dicts()
+    assert [response["record"] for response in responses[:2] + responses[3:]] == expected
+    assert (metrics["requests"], metrics["batches"]) == (len(lines), 1)
+
+def test_a_malformed_line_is_answered_with_an_error(short_form):
+    record = short_form("G220", n=1).to_dicts()[0]
+    lines = [
+        b"not json\n",
+        json.dumps({"dataset": "G220"}).encode() + b"\n",
+        json.dumps({"dataset": "G220", "record": record}).encode() + b"\n",
+    ]
+
+    *responses, metrics = asyncio.run(_requests(lines))
+
+    assert responses[0]["error"].startswith("JSONDecodeError")
+    assert responses[1]["error"].startswith("KeyError")
+    assert responses[2]["record"] == harmonise_dataset("G220", short_form("G220", n=1)).to_dicts()[0]
+    # and the connection stays open for the next request
+    assert metrics["requests"] == 1
+
+def test_metrics_keep_the_latest_window():
+    metrics = Metrics(window=3)
+    for size in range(1, 6):
+        metrics.add_batch([0.001] * size)
+    assert list(metrics.batch_sizes) == [3, 4, 5]
+    assert metrics.summary()["requests"] == 15
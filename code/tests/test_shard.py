@@ -0,0 +1,18 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from schedule import harmonise_dataset
+from shard import harmonise_sharded
+
+# G222 and G126 have the SIT clean-up after the short form rules
+@pytest.mark.parametrize("dset", ["G220", "G222", "G126", "G217"])
+def test_harmonise_sharded_matches_one_process(short_form, long_form, tmp_path, dset):
+    df = long_form() if dset == "G217" else short_form(dset)
+    sharded = harmonise_sharded(dset, df, n_shards=4, n_workers=2, queue=tmp_path)
+    assert_frame_equal(sharded, harmonise_dataset(dset, df))
+
+def test_harmonise_sharded_keeps_the_order_of_duplicate_ids(short_form, tmp_path):
+    df = short_form("G220").with_columns(pl.col("ID") // 10) # ten rows per ID
+    sharded = harmonise_sharded("G220", df, n_shards=4, n_workers=2, queue=tmp_path)
+    assert_frame_equal(sharded, harmonise_dataset("G220", df))
@@ -0,0 +1,22 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from harmonise_long import domain_columns, harmonise_ipaq_long
+from sparse import SparseBlock
+
+def test_harmonise_sparse_matches_dense(long_form):
+    df = long_form(n=1000)
+    job, trans, _ = domain_columns("G217", df.columns)
+    # Most participants have no job, and many no TRANS, so those domains are sparse (HOME stays dense)
+    df = df.with_columns(
+        *(pl.when(pl.col("ID") % 10 != 0).then(None).otherwise(pl.col(c)).alias(c) for c in job),
+        *(pl.when(pl.col("ID") % 5 != 0).then(None).otherwise(pl.col(c)).alias(c) for c in trans),
+    )
+    assert SparseBlock.from_frame(df, job).density < 0.15
+
+    assert_frame_equal(harmonise_ipaq_long("G217", df, sparse=True), harmonise_ipaq_long("G217", df))
+
+def test_densify_fills_the_rows_which_arent_valid():
+    df = pl.DataFrame({"a": [None, 1.0, None, 2.0], "b": [None, None, None, 3.0]})
+    block = SparseBlock.from_frame(df, ["a", "b"]).with_columns([pl.col("a").fill_null(0).alias("c")])
+    assert [s.to_list() for s in block.densify()] == [[None, 1.0, None, 2.0], [None, None, None, 3.0], [0.0, 1.0, 0.0, 2.0]]
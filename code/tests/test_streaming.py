@@ -0,0 +1,46 @@
+import warnings
+
+import polars as pl
+import pyreadstat
+import pytest
+from polars.testing import assert_frame_equal
+
+import main
+from config import DATASETS
+from sav import _read_rows, scan_sav
+from schedule import harmonise_dataset
+from streaming import blocking_operations, check_streaming
+
+@pytest.mark.parametrize("dset", ["G220", "G222", "G217"])
+def test_streaming_plan_matches_harmonising_in_memory(short_form, long_form, dset):
+    df = long_form() if dset == "G217" else short_form(dset)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error") # every operation streams
+        lf = harmonise_dataset(dset, df.lazy(), streaming=True)
+    assert_frame_equal(lf.collect(streaming=True), harmonise_dataset(dset, df))
+
+def test_check_streaming_warns_about_blocking_operations():
+    lf = pl.LazyFrame({"a": [3, 1, 2]})
+    assert blocking_operations(lf.with_columns(pl.col("a") * 2)) == []
+    with pytest.warns(UserWarning, match="can't run in the streaming engine"):
+        check_streaming(lf.with_columns(pl.col("a").cum_sum()))
+
+def test_scan_sav_matches_one_read(short_form, tmp_path):
+    path = tmp_path / "G220_Q.sav"
+    pyreadstat.write_sav(short_form("G220", n=250).to_pandas(), path)
+    (tmp_path / "staging").mkdir()
+
+    assert_frame_equal(scan_sav(path, tmp_path / "staging", chunk_rows=100).collect(), _read_rows(path))
+    assert len(list((tmp_path / "staging").iterdir())) == 3
+
+def test_main_streaming_sinks_each_dataset(short_form, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "DATASETS", {"G222": DATASETS["G222"]})
+    monkeypatch.setattr(main, "INTERIM_DATA", tmp_path)
+    monkeypatch.setattr(main, "PROCESSED_DATA", tmp_path)
+    file = tmp_path / DATASETS["G222"]["file"]
+    df = short_form("G222")
+    pyreadstat.write_sav(df.to_pandas(), file)
+
+    main.main_streaming()
+
+    assert_frame_equal(pl.read_parquet(file.with_suffix(".parquet")), harmonise_dataset("G222", _read_rows(file)))
@@ -0,0 +1,17 @@
+import pytest
+
+from harmonise_long import harmonise_ipaq_long
+import validate_long
+
+@pytest.mark.parametrize("validator", ["validate_jobs", "validate_totals"])
+def test_project_steps_matches_the_unprojected_validation(long_form, monkeypatch, validator):
+    df = harmonise_ipaq_long("G217", long_form())
+    projected = getattr(validate_long, validator)(df)
+    monkeypatch.setattr(validate_long, "project_steps", lambda validation: validation)
+    unprojected = getattr(validate_long, validator)(df)
+
+    assert projected.n_passed() == unprojected.n_passed()
+    assert projected.n_failed() == unprojected.n_failed()
+    extracts = projected.get_data_extracts()
+    assert extracts.keys() == unprojected.get_data_extracts().keys()
+    assert extracts and all("ID" in extract.columns for extract in extracts.values())
@@ -0,0 +1,40 @@
+import polars as pl
+import pytest
+
+from schedule import harmonise_dataset
+from validate_incremental import validate_incremental
+from validate_lazy import short_form_rules, validate_lazy
+
+def test_validate_incremental_matches_a_full_run(short_form):
+    df = harmonise_dataset("G220", short_form("G220"))
+    rules = short_form_rules("G220")
+    _, previous = validate_incremental(df, rules)
+
+    # Change some rows' values, remove some rows and add some new ones
+    changed = (
+        df.with_columns(pl.when(pl.col("ID") < 50).then(pl.col("G220_IPAQ_VIG_MINS") + 1).otherwise(pl.col("G220_IPAQ_VIG_MINS")))
+        .filter(pl.col("ID") % 7 != 0)
+    )
+    changed = pl.concat([changed, changed.head(20).with_columns(pl.col("ID") + 10_000)])
+
+    report, _ = validate_incremental(changed, rules, previous)
+    assert report.equals(validate_lazy(changed.lazy(), rules))
+
+@pytest.mark.parametrize("redefine", [
+    pl.Expr.not_, # a rule which fails every row it tests
+    lambda rule: pl.col("G220_IPAQ_VIG_W").is_in([0]), # only the set of `is_in` changes
+])
+def test_validate_incremental_reevaluates_a_redefined_rule(short_form, redefine):
+    df = harmonise_dataset("G220", short_form("G220"))
+    rules = short_form_rules("G220") | {"in_set(G220_IPAQ_VIG_W)": pl.col("G220_IPAQ_VIG_W").is_in([0, 1])}
+    _, previous = validate_incremental(df, rules)
+
+    name = next(iter(rules)) if redefine is pl.Expr.not_ else "in_set(G220_IPAQ_VIG_W)"
+    redefined = rules | {name: redefine(rules[name])}
+    report, results = validate_incremental(df, redefined, previous)
+
+    assert report.equals(validate_lazy(df.lazy(), redefined))
+    assert not report.equals(validate_lazy(df.lazy(), rules))
+    # and the results of the rules which didn't change were reused
+    _, again = validate_incremental(df, redefined, results)
+    assert again.equals(results)
@@ -0,0 +1,23 @@
+import polars as pl
+import pytest
+
+from schedule import harmonise_dataset
+from validate_lazy import short_form_rules, validate_lazy
+
+@pytest.mark.parametrize("harmonised", [False, True])
+def test_validate_lazy_matches_each_rule_evaluated_alone(short_form, harmonised):
+    df = short_form("G220")
+    df = harmonise_dataset("G220", df) if harmonised else df
+    rules = short_form_rules("G220")
+
+    report = validate_lazy(df.lazy(), rules, n_failing=5)
+
+    for name, rule in rules.items():
+        checked = df.select(pl.col("ID"), rule.alias("passed"))
+        assert report.filter(pl.col("rule") == name).row(0, named=True) == {
+            "rule": name,
+            "n": checked["passed"].count(),
+            "n_passed": checked["passed"].sum(),
+            "n_failed": checked["passed"].count() - checked["passed"].sum(),
+            "failing_ids": checked.filter(pl.col("passed").not_())["ID"].head(5).to_list(),
+        }
@@ -0,0 +1,40 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from failure_index import build_failure_index
+from schedule import harmonise_dataset
+from validate_lazy import short_form_rules, validate_lazy
+from validation_cache import validate_cached
+
+def test_validate_cached_matches_validate_lazy_and_build_failure_index(short_form, tmp_path):
+    df = harmonise_dataset("G220", short_form("G220"))
+    rules = short_form_rules("G220")
+
+    for _ in range(2): # evaluated, then read back from the cache
+        report, index = validate_cached(df, rules, tmp_path, n_failing=5)
+        assert_frame_equal(report, validate_lazy(df, rules, n_failing=5))
+        assert_frame_equal(index.runs, build_failure_index(df, rules).runs)
+
+def test_validate_cached_reevaluates_only_rules_reading_changed_columns(short_form, tmp_path):
+    df = harmonise_dataset("G220", short_form("G220"))
+    rules = short_form_rules("G220")
+    validate_cached(df, rules, tmp_path)
+    cached = set(tmp_path.iterdir())
+
+    changed = df.with_columns(pl.col("G220_IPAQ_VIG_D").fill_null(3))
+    report, _ = validate_cached(changed, rules, tmp_path)
+
+    assert len(set(tmp_path.iterdir()) - cached) == sum("G220_IPAQ_VIG_D" in rule.meta.root_names() for rule in rules.values())
+    assert_frame_equal(report, validate_lazy(changed, rules))
+
+def test_validate_cached_reevaluates_a_rule_whose_is_in_set_changed(short_form, tmp_path):
+    df = harmonise_dataset("G220", short_form("G220"))
+    rules = {"in_set(G220_IPAQ_VIG_W)": pl.col("G220_IPAQ_VIG_W").is_in([0, 1])}
+    validate_cached(df, rules, tmp_path)
+
+    redefined = {"in_set(G220_IPAQ_VIG_W)": pl.col("G220_IPAQ_VIG_W").is_in([0])}
+    report, index = validate_cached(df, redefined, tmp_path)
+
+    assert_frame_equal(report, validate_lazy(df, redefined))
+    assert_frame_equal(index.runs, build_failure_index(df, redefined).runs)
+    assert report["n_failed"].item() != validate_lazy(df, rules)["n_failed"].item()